@@ -91,6 +91,7 @@ export interface UserSchema {
   // Counts both EMAIL and PUSH notifications together for progressive interval calculation
   notification_state?: {
     last_notification_at?: string; // ISO 8601 timestamp - last proactive notification sent
+    last_notification_epoch?: number; // last_notification_at as Unix seconds (written by the notification orchestrator)
     notification_count?: number; // Total proactive notifications sent (email + push combined)
   };
   
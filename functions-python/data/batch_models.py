@@ -3,8 +3,12 @@ Pydantic Models for Batch Generation
 
 Data models for parallel generation operations (emails and chat messages).
 Used to structure inputs, outputs, and results of batch processing.
+
+Task inputs are built once per eligible user by the orchestrator from already
+checked values, so they are plain slotted dataclasses rather than pydantic models.
 """
 
+from dataclasses import dataclass
 from typing import Literal
 
 from pydantic import BaseModel
@@ -25,7 +29,8 @@ UserCategory = Literal[
 # Email Generation Models
 # ============================================================================
 
-class UserEmailTask(BaseModel):
+@dataclass(slots=True, frozen=True)
+class UserEmailTask:
     """
     Input model for a single user email generation task.
     
@@ -78,7 +83,8 @@ class BatchGenerationResult(BaseModel):
 # Chat Message Generation Models
 # ============================================================================
 
-class UserChatTask(BaseModel):
+@dataclass(slots=True, frozen=True)
+class UserChatTask:
     """
     Input model for a single user chat message generation task.
     
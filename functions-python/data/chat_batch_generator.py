@@ -31,12 +31,13 @@ from data.batch_models import (
     UserChatTask,
 )
 from data.firestore_models import ChatMessage, ContentItem
+from data.firestore_operations import flush_state_updates, update_notification_state_after_send
 from data.notification_content import (
     generate_first_push_notification,  # type: ignore
     generate_ongoing_push_notification,  # type: ignore
 )
 from utils.amplitude import track_amplitude_event
-from utils.logger import error, info, warn
+from utils.logger import debug, error, info, warn
 
 
 def chunk_list(items: list[Any], chunk_size: int) -> list[list[Any]]:
@@ -204,68 +205,83 @@ def _update_notification_counters_for_chunk(
     CRITICAL: This must be called immediately after successfully writing messages
     to prevent spam if subsequent operations fail.
     
-    IMPORTANT: Uses set() with merge=True to handle users without notification_state field.
-    Many users don't have this field initially, and update() would fail silently.
+    Counter updates are staged on a single WriteBatch and committed together
+    (one commit RPC per MAX_BATCH_WRITES users instead of one per user).
     
     Args:
         db: Firestore client instance
         user_ids: List of user IDs to update (from one chunk)
         
     Returns:
-        Dictionary mapping user_id to new notification_count (after increment)
+        Dictionary mapping user_id to new notification_count (after increment).
+        Users whose update was not committed are omitted.
     """
     notification_counts: dict[str, int] = {}
     
     if not user_ids:
         return notification_counts
     
-    from datetime import datetime, timezone
-    
     now = datetime.now(timezone.utc).isoformat()
     
-    # Process users individually to handle both first-time and existing notification_state
-    for user_id in user_ids:
-        try:
-            user_ref = db.collection('users').document(user_id)  # type: ignore
-            
-            # Get current user data to check if notification_state exists
-            user_doc = user_ref.get()  # type: ignore
-            
-            if not user_doc.exists:  # type: ignore
-                error("User document not found when updating notification counters", {
-                    "user_id": user_id
-                })
-                continue
-            
-            user_data = user_doc.to_dict()  # type: ignore
-            notification_state = user_data.get('notification_state', {}) if user_data else {}  # type: ignore
-            current_count: int = int(notification_state.get('notification_count', 0))  # type: ignore
-            new_count: int = current_count + 1
-            
-            # Use set() with merge=True to ensure field is created if it doesn't exist
-            user_ref.set({  # type: ignore
-                'notification_state': {
-                    'last_notification_at': now,
-                    'notification_count': new_count,
-                }
-            }, merge=True)  # type: ignore
-            
-            # Store new count for return
-            notification_counts[user_id] = new_count
+    users_ref = db.collection('users')  # type: ignore
+    batch = db.batch()  # type: ignore
+    pending_counts: dict[str, int] = {}  # Staged on current batch, not yet committed
+    
+    try:
+        for user_id in user_ids:
+            try:
+                user_ref = users_ref.document(user_id)  # type: ignore
+                
+                # Get current count to compute the new one (only notification_state is read)
+                user_doc = user_ref.get(field_paths=['notification_state'])  # type: ignore
+                
+                if not user_doc.exists:  # type: ignore
+                    error("User document not found when updating notification counters", {
+                        "user_id": user_id
+                    })
+                    continue
+                
+                user_data = user_doc.to_dict()  # type: ignore
+                notification_state = user_data.get('notification_state', {}) if user_data else {}  # type: ignore
+                current_count: int = int(notification_state.get('notification_count', 0))  # type: ignore
+                new_count: int = current_count + 1
+                
+                update_notification_state_after_send(
+                    db, user_id, new_count, now, batch=batch, user_ref=user_ref
+                )  # type: ignore
+                pending_counts[user_id] = new_count
+                
+            except Exception as err:
+                # Log individual user errors but continue with others
+                error(
+                    "Failed to update notification counter for user",
+                    {
+                        "user_id": user_id,
+                        "error": str(err),
+                    }
+                )
             
-        except Exception as err:
-            # Log individual user errors but continue with others
-            error(
-                "Failed to update notification counter for user",
-                {
-                    "user_id": user_id,
-                    "error": str(err),
-                }
-            )
+            if flush_state_updates(batch, len(pending_counts)):
+                notification_counts.update(pending_counts)
+                pending_counts = {}
+                batch = db.batch()  # type: ignore
+        
+        # Commit remaining updates
+        if flush_state_updates(batch, len(pending_counts), final=True):
+            notification_counts.update(pending_counts)
+        
+    except Exception as err:
+        error(
+            "Failed to commit notification counter updates",
+            {
+                "user_ids": list(pending_counts.keys()),
+                "error": str(err),
+            }
+        )
     
     info(
         "Notification counters updated for chunk",
-        {"count": len(user_ids)}
+        {"count": len(user_ids), "updated": len(notification_counts)}
     )
     
     return notification_counts
@@ -317,6 +333,7 @@ def _write_chat_messages_batch(
     # Split into chunks of 250 (conservative for thread updates)
     chunks = chunk_list(prepared_messages, 250)
     all_results: list[GeneratedChatMessage] = []
+    users_ref = db.collection('users')  # type: ignore
     
     for chunk_idx, chunk in enumerate(chunks):
         # === STEP 1: Pre-check thread existence for all messages in chunk ===
@@ -342,8 +359,7 @@ def _write_chat_messages_batch(
             
             # Get thread reference
             thread_ref = (  # type: ignore
-                db.collection('users')  # type: ignore
-                .document(task.user_id)  # type: ignore
+                users_ref.document(task.user_id)  # type: ignore
                 .collection('chatThreads')  # type: ignore
                 .document(thread_id)  # type: ignore
             )
@@ -541,7 +557,9 @@ def _generate_batch(
                 else:
                     # Success - result is (task, message_data) tuple
                     successful_messages.append(result)
-                    info(
+                    # Duplicate of the worker's per-user INFO line (counts are in the
+                    # final generation summary), so only logged at DEBUG
+                    debug(
                         "Chat message generated for user",
                         {
                             "user_id": task.user_id,
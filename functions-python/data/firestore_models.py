@@ -14,6 +14,7 @@ These models are intentionally minimal - only fields that we actually use
 in Python functions. Full schemas are in TypeScript.
 """
 
+from dataclasses import dataclass
 from typing import Any, Literal
 
 from pydantic import BaseModel, Field
@@ -93,6 +94,7 @@ class NotificationState(BaseModel):
     """
     notification_count: int = 0
     last_notification_at: str | None = None
+    last_notification_epoch: int | None = None  # last_notification_at as Unix seconds
 
 
 # ============================================================================
@@ -105,8 +107,9 @@ class UserBasic(BaseModel):
     
     Full schema: firestore/schemas/user.schema.ts
     Only includes fields we actually use in notification generation.
+    Custom fields (custom_* keys described by _fieldsMeta) are kept as model extras.
     """
-    model_config = {"populate_by_name": True}
+    model_config = {"populate_by_name": True, "extra": "allow"}
     
     name: str
     email: str
@@ -129,8 +132,9 @@ class BossBasic(BaseModel):
     
     Full schema: firestore/schemas/boss.schema.ts
     Only includes fields we actually use in notification generation.
+    Custom fields (custom_* keys described by _fieldsMeta) are kept as model extras.
     """
-    model_config = {"populate_by_name": True}
+    model_config = {"populate_by_name": True, "extra": "allow"}
     
     name: str
     position: str
@@ -186,12 +190,16 @@ class EmailBasic(BaseModel):
 # User Context Container
 # ============================================================================
 
-class UserContext(BaseModel):
+@dataclass(slots=True)
+class UserContext:
     """
     Complete user context for AI generation.
     
     Returned by fetch_user_context() function.
     Contains all data needed to generate personalized notifications.
+    
+    Plain slotted dataclass (not a pydantic model): it only groups models that
+    were already validated when fetched and is never serialized.
     """
     user: UserBasic | None
     bosses: list[BossBasic]
@@ -5,11 +5,20 @@ Pure functions for creating and updating Firestore documents.
 All functions take db client as first parameter for dependency injection.
 """
 
+from datetime import datetime
 from typing import Any
 
 from firebase_admin import firestore  # type: ignore
 from utils.logger import info
 
+# Sentinel resolved by Firestore to the commit time (looked up once, not per write)
+_SERVER_TIMESTAMP = firestore.SERVER_TIMESTAMP  # type: ignore
+
+
+def _user_ref(db: Any, user_id: str) -> Any:
+    """Reference to users/{user_id}."""
+    return db.collection('users').document(user_id)  # type: ignore
+
 
 def create_email_document(db: Any, user_id: str, email: str, subject: str, body: str) -> str:
     """
@@ -27,14 +36,14 @@ def create_email_document(db: Any, user_id: str, email: str, subject: str, body:
     Returns:
         Email document ID
     """
-    email_ref = db.collection('users').document(user_id).collection('emails').document()  # type: ignore
+    email_ref = _user_ref(db, user_id).collection('emails').document()  # type: ignore
     
     email_data: dict[str, Any] = {  # type: ignore
         'to': email,
         'subject': subject,
         'body_text': body,
         'state': 'PLANNED',
-        'createdAt': firestore.SERVER_TIMESTAMP,  # type: ignore
+        'createdAt': _SERVER_TIMESTAMP,
     }
     
     email_ref.set(email_data)  # type: ignore
@@ -59,8 +68,7 @@ def create_chat_message(db: Any, user_id: str, content: str) -> str:
     """
     thread_id = 'main'  # Single thread per user
     message_ref = (  # type: ignore
-        db.collection('users')  # type: ignore
-        .document(user_id)  # type: ignore
+        _user_ref(db, user_id)
         .collection('chatThreads')  # type: ignore
         .document(thread_id)  # type: ignore
         .collection('messages')  # type: ignore
@@ -70,7 +78,7 @@ def create_chat_message(db: Any, user_id: str, content: str) -> str:
     message_data: dict[str, Any] = {  # type: ignore
         'role': 'assistant',
         'content': [{'type': 'text', 'text': content}],
-        'timestamp': firestore.SERVER_TIMESTAMP,  # type: ignore
+        'timestamp': _SERVER_TIMESTAMP,
     }
     
     message_ref.set(message_data)  # type: ignore
@@ -78,3 +86,73 @@ def create_chat_message(db: Any, user_id: str, content: str) -> str:
     
     return message_ref.id  # type: ignore
 
+
+
+# Maximum number of operations in a single Firestore WriteBatch commit
+MAX_BATCH_WRITES = 500
+
+
+def update_notification_state_after_send(
+    db: Any,
+    user_id: str,
+    notification_count: int,
+    sent_at: str,
+    batch: Any | None = None,
+    user_ref: Any | None = None,
+) -> None:
+    """
+    Record a sent proactive notification in user's notification_state.
+    
+    Uses set() with merge=True to handle users without notification_state field.
+    
+    If batch is provided, the write is only staged on it and nothing is sent
+    to Firestore. The caller owns the batch and MUST commit it, including the
+    final partial batch (see flush_state_updates).
+    
+    Args:
+        db: Firestore client instance
+        user_id: User ID
+        notification_count: New notification count (after increment)
+        sent_at: ISO timestamp of the notification (also stored as Unix seconds in
+                 last_notification_epoch for cheap interval checks)
+        batch: Optional WriteBatch to stage the update on
+        user_ref: Optional users/{user_id} reference the caller already holds
+    """
+    if user_ref is None:
+        user_ref = _user_ref(db, user_id)
+    state_update: dict[str, Any] = {
+        'notification_state': {
+            'last_notification_at': sent_at,
+            'last_notification_epoch': int(datetime.fromisoformat(sent_at).timestamp()),
+            'notification_count': notification_count,
+        }
+    }
+    
+    if batch is None:
+        user_ref.set(state_update, merge=True)  # type: ignore
+    else:
+        batch.set(user_ref, state_update, merge=True)  # type: ignore
+
+
+def flush_state_updates(batch: Any, count: int, final: bool = False) -> bool:
+    """
+    Commit a batch of staged notification_state updates when it is full.
+    
+    Commits once count reaches MAX_BATCH_WRITES, or any non-empty batch when
+    final=True (the caller's last partial batch). A committed batch can't be
+    reused - callers start a new one via db.batch() when this returns True.
+    
+    Args:
+        batch: WriteBatch with staged updates
+        count: Number of updates staged on the batch
+        final: Commit regardless of size (end of caller's loop)
+        
+    Returns:
+        True if the batch was committed
+    """
+    if count == 0 or (count < MAX_BATCH_WRITES and not final):
+        return False
+    
+    batch.commit()  # type: ignore
+    info("Committed notification state updates", {"count": count})
+    return True
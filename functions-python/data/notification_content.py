@@ -19,6 +19,8 @@ Push notifications:
 All functions use OpenAI structured output for type-safe, validated responses.
 """
 
+from typing import Any
+
 from firebase_admin import firestore  # type: ignore
 
 from data.notification_models import ChatNotificationContent, EmailNotificationContent
@@ -28,7 +30,7 @@ from data.notification_prompts import (
     ONGOING_EMAIL_SYSTEM_PROMPT,
     ONGOING_PUSH_SYSTEM_PROMPT,
     ONBOARDING_WELCOME_EMAIL_PROMPT,
-    build_notification_prompt,
+    build_notification_user_prompt,
 )
 from data.user_context import fetch_user_context, format_user_context_as_text
 from utils.logger import info
@@ -72,12 +74,13 @@ def generate_first_email_notification(
     context = fetch_user_context(db, user_id)
     context_text = format_user_context_as_text(context)
     
-    # Build prompt
-    prompt = build_notification_prompt(FIRST_EMAIL_SYSTEM_PROMPT, context_text)
+    # Build prompt (static system prompt goes as its own message)
+    prompt = build_notification_user_prompt(context_text)
     
     # Generate content with structured output
     content = call_openai_with_structured_output(
         prompt=prompt,
+        system_prompt=FIRST_EMAIL_SYSTEM_PROMPT,
         response_model=EmailNotificationContent,
         user_id=user_id,
         session_id=session_id,
@@ -136,12 +139,13 @@ def generate_ongoing_email_notification(
     context = fetch_user_context(db, user_id)
     context_text = format_user_context_as_text(context)
     
-    # Build prompt
-    prompt = build_notification_prompt(ONGOING_EMAIL_SYSTEM_PROMPT, context_text)
+    # Build prompt (static system prompt goes as its own message)
+    prompt = build_notification_user_prompt(context_text)
     
     # Generate content with structured output
     content = call_openai_with_structured_output(
         prompt=prompt,
+        system_prompt=ONGOING_EMAIL_SYSTEM_PROMPT,
         response_model=EmailNotificationContent,
         user_id=user_id,
         session_id=session_id,
@@ -198,12 +202,13 @@ def generate_first_push_notification(
     context = fetch_user_context(db, user_id)
     context_text = format_user_context_as_text(context)
     
-    # Build prompt
-    prompt = build_notification_prompt(FIRST_PUSH_SYSTEM_PROMPT, context_text)
+    # Build prompt (static system prompt goes as its own message)
+    prompt = build_notification_user_prompt(context_text)
     
     # Generate content with structured output
     content = call_openai_with_structured_output(
         prompt=prompt,
+        system_prompt=FIRST_PUSH_SYSTEM_PROMPT,
         response_model=ChatNotificationContent,
         user_id=user_id,
         session_id=session_id,
@@ -260,12 +265,13 @@ def generate_ongoing_push_notification(
     context = fetch_user_context(db, user_id)
     context_text = format_user_context_as_text(context)
     
-    # Build prompt
-    prompt = build_notification_prompt(ONGOING_PUSH_SYSTEM_PROMPT, context_text)
+    # Build prompt (static system prompt goes as its own message)
+    prompt = build_notification_user_prompt(context_text)
     
     # Generate content with structured output
     content = call_openai_with_structured_output(
         prompt=prompt,
+        system_prompt=ONGOING_PUSH_SYSTEM_PROMPT,
         response_model=ChatNotificationContent,
         user_id=user_id,
         session_id=session_id,
@@ -289,6 +295,7 @@ def generate_onboarding_welcome_email(
     db: firestore.Client,  # type: ignore
     user_id: str,
     session_id: str | None = None,
+    user_data: dict[str, Any] | None = None,
 ) -> EmailNotificationContent:
     """
     Generate email notification for ONBOARDING_WELCOME scenario.
@@ -303,6 +310,7 @@ def generate_onboarding_welcome_email(
         db: Firestore client instance
         user_id: User document ID
         session_id: Optional session ID for LangFuse tracking
+        user_data: User document data already read by the caller (skips re-reading it)
         
     Returns:
         EmailNotificationContent with reasoning, title, and body fields
@@ -313,15 +321,16 @@ def generate_onboarding_welcome_email(
     )
     
     # Fetch and format user context
-    context = fetch_user_context(db, user_id)
+    context = fetch_user_context(db, user_id, prefetched_user=user_data)
     context_text = format_user_context_as_text(context)
     
     # Build prompt with new onboarding-specific system prompt
-    prompt = build_notification_prompt(ONBOARDING_WELCOME_EMAIL_PROMPT, context_text)
+    prompt = build_notification_user_prompt(context_text)
     
     # Generate content with structured output
     content = call_openai_with_structured_output(
         prompt=prompt,
+        system_prompt=ONBOARDING_WELCOME_EMAIL_PROMPT,
         response_model=EmailNotificationContent,
         user_id=user_id,
         session_id=session_id,
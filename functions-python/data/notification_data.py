@@ -5,21 +5,66 @@ Mailgun integration for syncing unsubscribe list with Firestore.
 All functions take db client as first parameter for dependency injection.
 """
 
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
 from typing import Any
 
-from utils.logger import error, info
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
+from utils.logger import error, info, warn
 
-def fetch_mailgun_unsubscribes(mailgun_api_key: str, mailgun_domain: str) -> list[str]:
+# Persistent HTTP session for Mailgun API calls
+# Reuses TCP+TLS connections across pagination requests and warm invocations,
+# and retries transient failures (rate limits, gateway errors) with backoff
+_MAILGUN_SESSION = requests.Session()
+_MAILGUN_SESSION.mount('https://', HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=10,
+    max_retries=Retry(total=3, backoff_factor=0.2, status_forcelist=[429, 502, 503, 504]),
+))
+
+# (connect, read) timeouts in seconds for Mailgun API requests
+MAILGUN_REQUEST_TIMEOUT = (5, 30)
+
+# Incremental sync state: meta/mailgun_sync stores when the last sync ran.
+# Unsubscribing is monotonic, so later runs only need suppressions created since then.
+# A periodic full sync catches anything missed (e.g. failed runs, clock skew).
+MAILGUN_SYNC_STATE_PATH = ('meta', 'mailgun_sync')
+MAILGUN_FULL_SYNC_INTERVAL = timedelta(days=30)
+MAILGUN_SYNC_OVERLAP = timedelta(hours=1)  # Re-check a window before last sync
+
+
+def _parse_mailgun_created_at(created_at: Any) -> datetime | None:
+    """Parse Mailgun's RFC 2822 `created_at` (e.g. 'Fri, 21 Oct 2011 11:02:55 GMT')."""
+    if not isinstance(created_at, str):
+        return None
+    try:
+        parsed = parsedate_to_datetime(created_at)
+    except (TypeError, ValueError):
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def fetch_mailgun_unsubscribes(
+    mailgun_api_key: str,
+    mailgun_domain: str,
+    since: datetime | None = None
+) -> list[str]:
     """
     Fetch list of unsubscribed emails from Mailgun Suppressions API.
     
     This function is safe to test in production - it only reads data, doesn't modify anything.
     Handles pagination to fetch all unsubscribed emails, not just the first page.
     
+    The Suppressions API has no server-side date filter, so `since` is applied to
+    each item's `created_at`; items with a missing/unparseable date are always kept.
+    
     Args:
         mailgun_api_key: Mailgun API key for authentication
         mailgun_domain: Mailgun domain (e.g., 'mailgun.services.ozma.io')
+        since: Only return unsubscribes created after this time (default: all)
         
     Returns:
         List of email addresses that have unsubscribed
@@ -28,8 +73,6 @@ def fetch_mailgun_unsubscribes(mailgun_api_key: str, mailgun_domain: str) -> lis
         ValueError: If API returns non-200 status
         requests.RequestException: If network request fails
     """
-    import requests
-    
     info("Fetching Mailgun unsubscribes (with pagination)", {"domain": mailgun_domain})
     
     all_unsubscribed_emails: list[str] = []
@@ -54,10 +97,11 @@ def fetch_mailgun_unsubscribes(mailgun_api_key: str, mailgun_domain: str) -> lis
         previous_url = url
         
         # Fetch current page
-        response = requests.get(
+        response = _MAILGUN_SESSION.get(
             url,
             auth=('api', mailgun_api_key),
-            params=params if page_count == 1 else None  # Only use params on first request
+            params=params if page_count == 1 else None,  # Only use params on first request
+            timeout=MAILGUN_REQUEST_TIMEOUT,
         )
         
         if response.status_code != 200:
@@ -77,7 +121,15 @@ def fetch_mailgun_unsubscribes(mailgun_api_key: str, mailgun_domain: str) -> lis
             break
         
         # Extract emails from current page
-        page_emails = [item['address'] for item in unsubscribes if 'address' in item]
+        page_emails: list[str] = []
+        for item in unsubscribes:
+            if 'address' not in item:
+                continue
+            if since is not None:
+                created_at = _parse_mailgun_created_at(item.get('created_at'))
+                if created_at is not None and created_at <= since:
+                    continue
+            page_emails.append(item['address'])
         all_unsubscribed_emails.extend(page_emails)
         
         info("Fetched Mailgun unsubscribes page", {
@@ -107,15 +159,51 @@ def fetch_mailgun_unsubscribes(mailgun_api_key: str, mailgun_domain: str) -> lis
     return all_unsubscribed_emails
 
 
+def _read_mailgun_sync_since(db: Any, now: datetime) -> datetime | None:
+    """
+    Decide the incremental sync cutoff from meta/mailgun_sync.
+    
+    Returns None (full sync) when there is no state yet, the state is unreadable,
+    or the last full sync is older than MAILGUN_FULL_SYNC_INTERVAL.
+    """
+    try:
+        state_doc = db.collection(MAILGUN_SYNC_STATE_PATH[0]).document(MAILGUN_SYNC_STATE_PATH[1]).get()
+        state = state_doc.to_dict() if state_doc.exists else None
+        if not state or not state.get('last_synced_at') or not state.get('last_full_sync_at'):
+            return None
+        
+        last_full_sync_at = datetime.fromisoformat(state['last_full_sync_at'])
+        if now - last_full_sync_at >= MAILGUN_FULL_SYNC_INTERVAL:
+            return None
+        
+        last_synced_at = datetime.fromisoformat(state['last_synced_at'])
+        return last_synced_at - MAILGUN_SYNC_OVERLAP
+    except Exception as err:
+        warn("Failed to read Mailgun sync state, running full sync", {"error": str(err)})
+        return None
+
+
+def _write_mailgun_sync_state(db: Any, synced_at: datetime, full_sync: bool) -> None:
+    """Record a successful sync in meta/mailgun_sync (failures only cost a wider next sync)."""
+    state: dict[str, Any] = {'last_synced_at': synced_at.isoformat()}
+    if full_sync:
+        state['last_full_sync_at'] = synced_at.isoformat()
+    try:
+        db.collection(MAILGUN_SYNC_STATE_PATH[0]).document(MAILGUN_SYNC_STATE_PATH[1]).set(state, merge=True)
+    except Exception as err:
+        warn("Failed to write Mailgun sync state", {"error": str(err)})
+
+
 def sync_mailgun_unsubscribes(db: Any) -> int:
     """
     Sync unsubscribe list from Mailgun and update Firestore.
     
     Implementation:
-    1. Fetch suppressions list from Mailgun API
+    1. Fetch suppressions list from Mailgun API (only entries created since the
+       last sync, see meta/mailgun_sync; full list every MAILGUN_FULL_SYNC_INTERVAL)
     2. For each unsubscribed email, find user in Firestore
     3. Batch update email_unsubscribed=true for all matching users
-    4. Return count of updated users
+    4. Record the sync time and return count of updated users
     
     Args:
         db: Firestore client instance
@@ -138,17 +226,45 @@ def sync_mailgun_unsubscribes(db: Any) -> int:
     
     mailgun_domain = 'mailgun.services.ozma.io'
     
+    # Captured before fetching so unsubscribes arriving mid-sync are picked up next run
+    sync_started_at = datetime.now(timezone.utc)
+    since = _read_mailgun_sync_since(db, sync_started_at)
+    full_sync = since is None
+    info("Mailgun sync mode", {
+        "full_sync": full_sync,
+        "since": since.isoformat() if since else None,
+    })
+    
     # Fetch unsubscribed emails from Mailgun
     try:
-        unsubscribed_emails = fetch_mailgun_unsubscribes(mailgun_api_key, mailgun_domain)
+        unsubscribed_emails = fetch_mailgun_unsubscribes(mailgun_api_key, mailgun_domain, since=since)
     except Exception as e:
         error("Failed to fetch Mailgun unsubscribes", {"error": str(e)})
         raise
     
     if not unsubscribed_emails:
         info("No unsubscribes found in Mailgun", {})
+        _write_mailgun_sync_state(db, sync_started_at, full_sync)
         return 0
     
+    # Dedupe before querying: Mailgun can return the same address more than once.
+    # Firestore stores emails as written at signup, so match both the address as
+    # Mailgun reports it and its lowercased form (Firebase Auth lowercases emails).
+    fetched_count = len(unsubscribed_emails)
+    normalized_emails: set[str] = set()
+    for raw_email in unsubscribed_emails:
+        stripped_email = raw_email.strip() if raw_email else ''
+        if stripped_email:
+            normalized_emails.add(stripped_email)
+            normalized_emails.add(stripped_email.lower())
+    unsubscribed_emails = sorted(normalized_emails)
+    
+    if fetched_count != len(unsubscribed_emails):
+        info("Normalized Mailgun unsubscribes", {
+            "fetched_emails": fetched_count,
+            "query_emails": len(unsubscribed_emails),
+        })
+    
     # Find and update users in Firestore using batched WHERE IN queries
     # Firestore supports up to 30 values in WHERE IN clause, so we chunk emails
     updated_count = 0
@@ -163,12 +279,20 @@ def sync_mailgun_unsubscribes(db: Any) -> int:
     
     # Fetch all matching users using chunked WHERE IN queries
     all_user_docs: list[Any] = []
+    seen_user_ids: set[str] = set()
     users_ref = db.collection('users')
     
     for chunk_idx, email_chunk in enumerate(email_chunks):
-        query = users_ref.where('email', 'in', email_chunk)
+        # No server-side email_unsubscribed filter: user docs are created without that
+        # field, and `== False` would skip exactly the users that still need marking.
+        # Project to the two fields the loop below reads instead of full documents.
+        query = users_ref.where('email', 'in', email_chunk).select(['email', 'email_unsubscribed'])
         chunk_users = list(query.stream())
-        all_user_docs.extend(chunk_users)
+        # Case variants of one address may land in different chunks - keep each user once
+        for user_doc in chunk_users:
+            if user_doc.id not in seen_user_ids:
+                seen_user_ids.add(user_doc.id)
+                all_user_docs.append(user_doc)
         
         info("Fetched users chunk", {
             "chunk_index": chunk_idx + 1,
@@ -235,5 +359,7 @@ def sync_mailgun_unsubscribes(db: Any) -> int:
         "users_updated": updated_count
     })
     
+    _write_mailgun_sync_state(db, sync_started_at, full_sync)
+    
     return updated_count
 
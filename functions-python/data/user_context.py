@@ -7,11 +7,15 @@ and formats it into a readable text representation for AI context.
 Ported from TypeScript: functions/src/chat.ts (fetchUserContext)
 """
 
-from typing import Any
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, TypeVar
 
 from firebase_admin import firestore  # type: ignore
-from google.api_core.retry import Retry  # type: ignore
-from google.api_core.exceptions import DeadlineExceeded, RetryError, ServerError  # type: ignore
+from google.api_core.retry import Retry, if_exception_type  # type: ignore
+from google.api_core.exceptions import Aborted, DeadlineExceeded, RetryError, ServerError  # type: ignore
+from pydantic import BaseModel
 
 from data.firestore_models import (
     BossBasic,
@@ -24,8 +28,229 @@ from data.firestore_models import (
 )
 from utils.logger import error, info, warn
 
+# Shared pool for context section reads. Reused across users and warm invocations
+# (no per-call thread startup) and caps in-flight Firestore reads when many users'
+# contexts are fetched at once by the batch generators.
+CONTEXT_FETCH_MAX_WORKERS = 32
+_CONTEXT_FETCH_EXECUTOR = ThreadPoolExecutor(
+    max_workers=CONTEXT_FETCH_MAX_WORKERS,
+    thread_name_prefix='user-context',
+)
+
+# Fields rendered from entry/email docs (mirrors EntryBasic/EmailBasic).
+# Used as Firestore projections so unrendered data (e.g. survey answers,
+# email recipients and delivery errors) is never transferred.
+# User and boss docs are read in full: their custom_* fields are dynamic
+# keys only known from each document's own _fieldsMeta.
+ENTRY_CONTEXT_FIELDS: list[str] = ['type', 'subtype', 'title', 'content', 'timestamp']
+EMAIL_CONTEXT_FIELDS: list[str] = ['subject', 'body_markdown', 'state', 'sentAt']
+
+# Retry policy for context reads (built once, shared by all calls).
+# Exponential backoff with jitter (built into Retry) starting at 100ms; transient
+# server errors (5xx: ServiceUnavailable, InternalServerError), Aborted and
+# deadline errors are retried. Gives up after 10s so one bad section degrades
+# to empty data instead of stalling the whole context fetch.
+CONTEXT_READ_RETRY = Retry(
+    initial=0.1,  # Initial delay of 100ms
+    maximum=2.0,  # Maximum delay of 2 seconds
+    multiplier=2.0,  # Double the delay each time
+    timeout=10.0,  # Overall retry budget of 10 seconds
+    predicate=if_exception_type(DeadlineExceeded, RetryError, ServerError, Aborted),
+)
+
+# Per-RPC timeout for context reads (seconds), so a single slow call
+# can't consume the whole retry budget
+CONTEXT_READ_TIMEOUT = 5.0
+
+# Build flat context models (bosses, entries, emails) with model_construct instead
+# of full validation. Documents missing a required field still go through normal
+# validation (and are skipped with a warning if invalid). Leave unset to validate
+# everything, e.g. in staging; ChatMessage has nested models and always validates.
+TRUST_FIRESTORE_SHAPE = os.getenv("TRUST_FIRESTORE_SHAPE", "").lower() in ("1", "true")
+
+ContextModelT = TypeVar("ContextModelT", bound=BaseModel)
+
+
+@lru_cache(maxsize=None)
+def _required_keys(model_cls: type[BaseModel]) -> frozenset[str]:
+    """Firestore keys (alias or field name) of a model's required fields."""
+    return frozenset(
+        field.alias or name
+        for name, field in model_cls.model_fields.items()
+        if field.is_required()
+    )
+
+
+def _build_context_model(model_cls: type[ContextModelT], data: dict[str, Any]) -> ContextModelT:
+    """Construct a flat context model, skipping validation when the shape is trusted."""
+    if TRUST_FIRESTORE_SHAPE and _required_keys(model_cls) <= data.keys():
+        return model_cls.model_construct(**data)
+    return model_cls(**data)
+
+
+def _parse_user_profile(user_id: str, user_dict: dict[str, Any] | None) -> UserBasic | None:
+    """Parse user document data into UserBasic (None if empty or invalid)."""
+    if not user_dict:
+        return None
+    try:
+        return UserBasic(**user_dict)
+    except Exception as validation_err:
+        warn(
+            "Failed to parse user data, continuing with None",
+            {"user_id": user_id, "error": str(validation_err)}
+        )
+    return None
+
+
+def _fetch_user_profile(user_ref: Any, user_id: str, retry_policy: Retry) -> UserBasic | None:
+    """Fetch and parse the user profile document (None if missing or invalid)."""
+    try:
+        user_doc = user_ref.get(retry=retry_policy, timeout=CONTEXT_READ_TIMEOUT)
+    except (DeadlineExceeded, RetryError) as err:
+        warn(
+            "Failed to fetch user profile, continuing with empty data",
+            {"user_id": user_id, "error": str(err)}
+        )
+        return None
+    if not user_doc.exists:
+        return None
+    return _parse_user_profile(user_id, user_doc.to_dict())
 
-def fetch_user_context(db: Any, user_id: str) -> UserContext:
+
+def _fetch_bosses(user_ref: Any, user_id: str, retry_policy: Retry) -> list[BossBasic]:
+    """Fetch all bosses ordered by createdAt."""
+    bosses_data: list[BossBasic] = []
+    try:
+        bosses_ref = user_ref.collection("bosses").order_by("createdAt", direction=firestore.Query.ASCENDING)  # type: ignore
+        bosses_snapshot = bosses_ref.get(retry=retry_policy, timeout=CONTEXT_READ_TIMEOUT)
+        
+        for boss_doc in bosses_snapshot:
+            boss_dict = boss_doc.to_dict()
+            if boss_dict:
+                boss_dict["id"] = boss_doc.id
+                try:
+                    bosses_data.append(_build_context_model(BossBasic, boss_dict))
+                except Exception as validation_err:
+                    warn(
+                        "Failed to parse boss data, skipping",
+                        {"boss_id": boss_doc.id, "error": str(validation_err)},
+                        sentry=False,
+                    )
+    except (DeadlineExceeded, RetryError) as err:
+        warn(
+            "Failed to fetch bosses, continuing with empty data",
+            {"user_id": user_id, "error": str(err)}
+        )
+    return bosses_data
+
+
+def _fetch_entries(user_ref: Any, user_id: str, retry_policy: Retry) -> list[EntryBasic]:
+    """Fetch last 50 timeline entries (newest first)."""
+    entries_data: list[EntryBasic] = []
+    try:
+        entries_ref = (
+            user_ref.collection("entries")
+            .select(ENTRY_CONTEXT_FIELDS)  # type: ignore
+            .order_by("timestamp", direction=firestore.Query.DESCENDING)  # type: ignore
+            .limit(50)
+        )
+        # Stream so documents are parsed while later ones are still arriving
+        for entry_doc in entries_ref.stream(retry=retry_policy, timeout=CONTEXT_READ_TIMEOUT):
+            entry_dict = entry_doc.to_dict()
+            if entry_dict:
+                entry_dict["id"] = entry_doc.id
+                try:
+                    entries_data.append(_build_context_model(EntryBasic, entry_dict))
+                except Exception as validation_err:
+                    warn(
+                        "Failed to parse entry data, skipping",
+                        {"entry_id": entry_doc.id, "error": str(validation_err)},
+                        sentry=False,
+                    )
+    except (DeadlineExceeded, RetryError) as err:
+        warn(
+            "Failed to fetch entries, continuing with empty data",
+            {"user_id": user_id, "error": str(err)}
+        )
+    return entries_data
+
+
+def _fetch_emails(user_ref: Any, user_id: str, retry_policy: Retry) -> list[EmailBasic]:
+    """Fetch last 15 sent emails (newest first)."""
+    emails_data: list[EmailBasic] = []
+    try:
+        emails_ref = (
+            user_ref.collection("emails")
+            .select(EMAIL_CONTEXT_FIELDS)  # type: ignore
+            .where("state", "==", "SENT")  # type: ignore
+            .order_by("sentAt", direction=firestore.Query.DESCENDING)  # type: ignore
+            .limit(15)
+        )
+        # Stream so documents are parsed while later ones are still arriving
+        for email_doc in emails_ref.stream(retry=retry_policy, timeout=CONTEXT_READ_TIMEOUT):  # type: ignore
+            email_dict = email_doc.to_dict()  # type: ignore
+            if email_dict:
+                email_dict["id"] = email_doc.id  # type: ignore
+                try:
+                    emails_data.append(_build_context_model(EmailBasic, email_dict))
+                except Exception as validation_err:
+                    warn(
+                        "Failed to parse email data, skipping",
+                        {"email_id": email_doc.id, "error": str(validation_err)},
+                        sentry=False,
+                    )
+    except (DeadlineExceeded, RetryError) as err:
+        warn(
+            "Failed to fetch emails, continuing with empty data",
+            {"user_id": user_id, "error": str(err)}
+        )
+    return emails_data
+
+
+def _fetch_chat_messages(user_ref: Any, user_id: str, retry_policy: Retry) -> list[ChatMessage]:
+    """Fetch last 30 chat messages across all threads (newest first)."""
+    chat_messages_data: list[ChatMessage] = []
+    try:
+        # One collection group query over every chatThreads/*/messages subcollection
+        # under this user (parent-scoped, so no userId field is needed on messages).
+        # Reads exactly the newest 30 messages instead of 30 per thread.
+        # Requires the messages.timestamp COLLECTION_GROUP index in firestore.indexes.json
+        messages_query = (
+            firestore.CollectionGroup(user_ref.collection("messages"))  # type: ignore
+            .order_by("timestamp", direction=firestore.Query.DESCENDING)  # type: ignore
+            .limit(30)
+        )
+        messages_snapshot = messages_query.get(retry=retry_policy, timeout=CONTEXT_READ_TIMEOUT)
+        
+        for msg_doc in messages_snapshot:
+            msg_dict = msg_doc.to_dict()
+            if msg_dict:
+                msg_dict["id"] = msg_doc.id
+                # .../chatThreads/{threadId}/messages/{messageId}
+                msg_dict["thread_id"] = msg_doc.reference.parent.parent.id
+                try:
+                    chat_messages_data.append(ChatMessage(**msg_dict))
+                except Exception as validation_err:
+                    warn(
+                        "Failed to parse chat message, skipping",
+                        {"message_id": msg_doc.id, "error": str(validation_err)},
+                        sentry=False,
+                    )
+        
+    except (DeadlineExceeded, RetryError) as err:
+        warn(
+            "Failed to fetch chat messages, continuing with empty data",
+            {"user_id": user_id, "error": str(err)}
+        )
+    return chat_messages_data
+
+
+def fetch_user_context(
+    db: Any,
+    user_id: str,
+    *,
+    prefetched_user: dict[str, Any] | None = None,
+) -> UserContext:
     """
     Fetch all user context data from Firestore.
     
@@ -36,9 +261,14 @@ def fetch_user_context(db: Any, user_id: str) -> UserContext:
     - Last 15 sent emails (ordered by sentAt desc)
     - Last 30 chat messages from all threads (ordered by timestamp desc)
     
+    The five reads are independent, so they are issued concurrently
+    (wall time is the slowest read instead of the sum of all reads).
+    
     Args:
         db: Firestore client instance
         user_id: User document ID
+        prefetched_user: User document data the caller already read; the
+            profile read is skipped and this data is parsed instead
         
     Returns:
         UserContext object containing:
@@ -48,158 +278,30 @@ def fetch_user_context(db: Any, user_id: str) -> UserContext:
             - emails: List of EmailBasic documents
             - chat_messages: List of ChatMessage documents
     """
-    # Configure retry policy for Firestore operations
-    # Retry up to 3 times with exponential backoff to handle transient failures
-    retry_policy = Retry(
-        initial=1.0,  # Initial delay of 1 second
-        maximum=10.0,  # Maximum delay of 10 seconds
-        multiplier=2.0,  # Double the delay each time
-        timeout=30.0,  # Reduced timeout to 30 seconds
-        predicate=lambda exc: isinstance(exc, (DeadlineExceeded, RetryError, ServerError))
-    )
+    retry_policy = CONTEXT_READ_RETRY
     
     try:
-        # Fetch user profile
         user_ref = db.collection("users").document(user_id)
-        user_data: UserBasic | None = None
-        try:
-            user_doc = user_ref.get(retry=retry_policy)
-            if user_doc.exists:
-                user_dict = user_doc.to_dict()
-                if user_dict:
-                    user_data = UserBasic(**user_dict)
-        except (DeadlineExceeded, RetryError) as err:
-            warn(
-                "Failed to fetch user profile, continuing with empty data",
-                {"user_id": user_id, "error": str(err)}
-            )
-        except Exception as validation_err:
-            warn(
-                "Failed to parse user data, continuing with None",
-                {"user_id": user_id, "error": str(validation_err)}
-            )
         
-        # Fetch all bosses
-        bosses_data: list[BossBasic] = []
-        try:
-            bosses_ref = user_ref.collection("bosses").order_by("createdAt", direction=firestore.Query.ASCENDING)  # type: ignore
-            bosses_snapshot = bosses_ref.get(retry=retry_policy)
-            
-            for boss_doc in bosses_snapshot:
-                boss_dict = boss_doc.to_dict()
-                if boss_dict:
-                    boss_dict["id"] = boss_doc.id
-                    try:
-                        bosses_data.append(BossBasic(**boss_dict))
-                    except Exception as validation_err:
-                        warn(
-                            "Failed to parse boss data, skipping",
-                            {"boss_id": boss_doc.id, "error": str(validation_err)}
-                        )
-        except (DeadlineExceeded, RetryError) as err:
-            warn(
-                "Failed to fetch bosses, continuing with empty data",
-                {"user_id": user_id, "error": str(err)}
-            )
-        
-        # Fetch last 50 timeline entries
-        entries_data: list[EntryBasic] = []
-        try:
-            entries_ref = (
-                user_ref.collection("entries")
-                .order_by("timestamp", direction=firestore.Query.DESCENDING)  # type: ignore
-                .limit(50)
-            )
-            entries_snapshot = entries_ref.get(retry=retry_policy)
-            
-            for entry_doc in entries_snapshot:
-                entry_dict = entry_doc.to_dict()
-                if entry_dict:
-                    entry_dict["id"] = entry_doc.id
-                    try:
-                        entries_data.append(EntryBasic(**entry_dict))
-                    except Exception as validation_err:
-                        warn(
-                            "Failed to parse entry data, skipping",
-                            {"entry_id": entry_doc.id, "error": str(validation_err)}
-                        )
-        except (DeadlineExceeded, RetryError) as err:
-            warn(
-                "Failed to fetch entries, continuing with empty data",
-                {"user_id": user_id, "error": str(err)}
-            )
-        
-        # Fetch last 15 sent emails
-        emails_data: list[EmailBasic] = []
-        try:
-            emails_ref = (
-                user_ref.collection("emails")
-                .where("state", "==", "SENT")  # type: ignore
-                .order_by("sentAt", direction=firestore.Query.DESCENDING)  # type: ignore
-                .limit(15)
-            )
-            emails_snapshot = emails_ref.get(retry=retry_policy)
-            
-            for email_doc in emails_snapshot:  # type: ignore
-                email_dict = email_doc.to_dict()  # type: ignore
-                if email_dict:
-                    email_dict["id"] = email_doc.id  # type: ignore
-                    try:
-                        emails_data.append(EmailBasic(**email_dict))
-                    except Exception as validation_err:
-                        warn(
-                            "Failed to parse email data, skipping",
-                            {"email_id": email_doc.id, "error": str(validation_err)}
-                        )
-        except (DeadlineExceeded, RetryError) as err:
-            warn(
-                "Failed to fetch emails, continuing with empty data",
-                {"user_id": user_id, "error": str(err)}
-            )
+        # Independent reads (user, bosses, entries, emails, chat) on the shared pool
+        executor = _CONTEXT_FETCH_EXECUTOR
+        user_future = (
+            executor.submit(_fetch_user_profile, user_ref, user_id, retry_policy)
+            if prefetched_user is None else None
+        )
+        bosses_future = executor.submit(_fetch_bosses, user_ref, user_id, retry_policy)
+        entries_future = executor.submit(_fetch_entries, user_ref, user_id, retry_policy)
+        emails_future = executor.submit(_fetch_emails, user_ref, user_id, retry_policy)
+        chat_future = executor.submit(_fetch_chat_messages, user_ref, user_id, retry_policy)
         
-        # Fetch last 30 chat messages from all threads
-        chat_messages_data: list[ChatMessage] = []
-        try:
-            # Get all chat threads
-            threads_ref = user_ref.collection("chatThreads")
-            threads_snapshot = threads_ref.get(retry=retry_policy)
-            
-            # Collect messages from all threads
-            all_messages: list[tuple[ChatMessage, str]] = []  # (ChatMessage, timestamp)
-            
-            for thread_doc in threads_snapshot:
-                thread_id = thread_doc.id
-                messages_ref = (
-                    threads_ref.document(thread_id)
-                    .collection("messages")
-                    .order_by("timestamp", direction=firestore.Query.DESCENDING)  # type: ignore
-                    .limit(30)  # Fetch up to 30 from each thread
-                )
-                messages_snapshot = messages_ref.get(retry=retry_policy)
-                
-                for msg_doc in messages_snapshot:
-                    msg_dict = msg_doc.to_dict()
-                    if msg_dict:
-                        msg_dict["id"] = msg_doc.id
-                        msg_dict["thread_id"] = thread_id
-                        try:
-                            chat_msg = ChatMessage(**msg_dict)
-                            all_messages.append((chat_msg, chat_msg.timestamp))
-                        except Exception as validation_err:
-                            warn(
-                                "Failed to parse chat message, skipping",
-                                {"message_id": msg_doc.id, "error": str(validation_err)}
-                            )
-            
-            # Sort all messages by timestamp (newest first) and take last 30
-            all_messages.sort(key=lambda x: x[1], reverse=True)
-            chat_messages_data = [msg for msg, _ in all_messages[:30]]
-            
-        except (DeadlineExceeded, RetryError) as err:
-            warn(
-                "Failed to fetch chat messages, continuing with empty data",
-                {"user_id": user_id, "error": str(err)}
-            )
+        user_data = (
+            user_future.result() if user_future is not None
+            else _parse_user_profile(user_id, prefetched_user)
+        )
+        bosses_data = bosses_future.result()
+        entries_data = entries_future.result()
+        emails_data = emails_future.result()
+        chat_messages_data = chat_future.result()
         
         info(
             "User context fetched successfully",
@@ -231,6 +333,43 @@ def fetch_user_context(db: Any, user_id: str) -> UserContext:
         raise
 
 
+@lru_cache(maxsize=None)
+def _field_alias_map(model_cls: type[BaseModel]) -> dict[str, str]:
+    """Map Firestore key (alias or field name) -> attribute name for a model class."""
+    return {field.alias or name: name for name, field in model_cls.model_fields.items()}
+
+
+def _render_custom_fields(model: BaseModel, fields_meta: dict[str, dict[str, Any]]) -> list[str]:
+    """
+    Render "label: value" lines for the custom fields declared in fields_meta.
+    
+    Values are read straight from the model without dumping it: custom fields
+    live in model_extra, keys matching a declared field (by alias or name) are
+    read from the attribute. Fields without a value are skipped.
+    """
+    extra = model.model_extra or {}
+    alias_map = _field_alias_map(type(model))
+    lines: list[str] = []
+    for field_key, field_meta in fields_meta.items():
+        if field_key in extra:
+            field_value = extra[field_key]
+        else:
+            attr_name = alias_map.get(field_key)
+            field_value = getattr(model, attr_name) if attr_name is not None else None
+        if field_value is not None:
+            lines.append(f"{field_meta.get('label', field_key)}: {field_value}")
+    return lines
+
+
+# Fixed header of the chat history section (one part instead of four; the trailing
+# newline keeps the blank line before the first message)
+_CHAT_HISTORY_HEADER = (
+    "\n## Chat Message History (IMPORTANT - Review Before Generating)\n"
+    "This is your conversation history with the user. All these messages are visible on screen.\n"
+    "IMPORTANT: Do NOT repeat yourself. Consider what you've already discussed.\n"
+)
+
+
 def format_user_context_as_text(context: UserContext) -> str:
     """
     Format user context as readable text.
@@ -258,42 +397,36 @@ def format_user_context_as_text(context: UserContext) -> str:
     
     # User profile section
     if user_data:
-        context_parts.append("## User Profile")
-        context_parts.append(f"Name: {user_data.name}")
-        context_parts.append(f"Position: {user_data.position}")
-        context_parts.append(f"Goal: {user_data.goal}")
+        context_parts.append(
+            f"## User Profile\n"
+            f"Name: {user_data.name}\n"
+            f"Position: {user_data.position}\n"
+            f"Goal: {user_data.goal}"
+        )
         
         # Add custom fields if they exist
         if user_data.fields_meta:
             context_parts.append("\n### Custom Profile Fields")
-            user_dict = user_data.model_dump(by_alias=True)
-            for field_key, field_meta in user_data.fields_meta.items():
-                field_value = user_dict.get(field_key)
-                if field_value is not None:
-                    label = field_meta.get("label", field_key)
-                    context_parts.append(f"{label}: {field_value}")
+            context_parts.extend(_render_custom_fields(user_data, user_data.fields_meta))
     
     # Bosses section
     if bosses_data:
         context_parts.append("\n## Bosses")
         
         for boss in bosses_data:
-            context_parts.append(f"\n### Boss: {boss.name}")
-            context_parts.append(f"Position: {boss.position}")
-            context_parts.append(f"Department: {boss.department or 'Not set'}")
-            context_parts.append(f"Management Style: {boss.managementStyle}")
-            context_parts.append(f"Working Hours: {boss.workingHours or 'Not set'}")
-            context_parts.append(f"Started At: {boss.startedAt}")
+            context_parts.append(
+                f"\n### Boss: {boss.name}\n"
+                f"Position: {boss.position}\n"
+                f"Department: {boss.department or 'Not set'}\n"
+                f"Management Style: {boss.managementStyle}\n"
+                f"Working Hours: {boss.workingHours or 'Not set'}\n"
+                f"Started At: {boss.startedAt}"
+            )
             
             # Add custom fields if they exist
             if boss.fields_meta:
                 context_parts.append("\n#### Custom Boss Fields")
-                boss_dict = boss.model_dump(by_alias=True)
-                for field_key, field_meta in boss.fields_meta.items():
-                    field_value = boss_dict.get(field_key)
-                    if field_value is not None:
-                        label = field_meta.get("label", field_key)
-                        context_parts.append(f"{label}: {field_value}")
+                context_parts.extend(_render_custom_fields(boss, boss.fields_meta))
     
     # Timeline entries section
     if entries_data:
@@ -310,10 +443,7 @@ def format_user_context_as_text(context: UserContext) -> str:
     
     # Chat message history section - CRITICAL for context continuity
     if chat_messages_data:
-        context_parts.append("\n## Chat Message History (IMPORTANT - Review Before Generating)")
-        context_parts.append("This is your conversation history with the user. All these messages are visible on screen.")
-        context_parts.append("IMPORTANT: Do NOT repeat yourself. Consider what you've already discussed.")
-        context_parts.append("")
+        context_parts.append(_CHAT_HISTORY_HEADER)
         
         for msg in reversed(chat_messages_data):  # Show oldest first (chronological order)
             # Extract text from content using helper function
@@ -328,9 +458,11 @@ def format_user_context_as_text(context: UserContext) -> str:
     if emails_data:
         context_parts.append("\n## Previous Email Notifications Sent to User")
         for email in emails_data:
-            context_parts.append(f"\n### Email sent at {email.sentAt or 'Unknown time'}")
-            context_parts.append(f"Subject: {email.subject}")
-            context_parts.append(f"Body:\n{email.body_markdown}")
+            context_parts.append(
+                f"\n### Email sent at {email.sentAt or 'Unknown time'}\n"
+                f"Subject: {email.subject}\n"
+                f"Body:\n{email.body_markdown}"
+            )
     
     return "\n".join(context_parts)
 
@@ -6,6 +6,7 @@ All business logic is delegated to separate modules for testability.
 """
 
 import os
+import threading
 from typing import Any
 
 import firebase_admin  # type: ignore
@@ -21,8 +22,21 @@ from timeout_monitor import create_timeout_monitor  # type: ignore
 from utils.logger import error, info, warn
 from utils.sentry import init_sentry
 
-# Initialize Sentry for error monitoring
-init_sentry()
+# Sentry is initialized on first use (see _init_sentry_once), not at import
+_sentry_initialized = False
+
+# Secrets injected into the environment (cleaned once per container)
+SECRETS_TO_CLEAN = (
+    'MAILGUN_API_KEY',
+    'OPENAI_API_KEY',
+    'LANGFUSE_PUBLIC_KEY',
+    'LANGFUSE_SECRET_KEY',
+    'AMPLITUDE_API_KEY',
+)
+_secrets_cleaned = False
+
+# Langfuse environment is configured once per container
+_langfuse_configured = False
 
 # Define secrets
 mailgun_api_key = SecretParam('MAILGUN_API_KEY')
@@ -31,6 +45,23 @@ langfuse_public_key = SecretParam('LANGFUSE_PUBLIC_KEY')
 langfuse_secret_key = SecretParam('LANGFUSE_SECRET_KEY')
 amplitude_api_key = SecretParam('AMPLITUDE_API_KEY')
 
+# Function timeouts (shared by the decorators and the timeout monitors)
+_ORCHESTRATOR_TIMEOUT: int = FUNCTION_TIMEOUTS['notificationOrchestrator']  # type: ignore
+_WELCOME_EMAIL_TIMEOUT: int = FUNCTION_TIMEOUTS['onChatMessageCreatedSendWelcomeEmail']  # type: ignore
+
+
+def _init_sentry_once() -> None:
+    """
+    Initialize Sentry for error monitoring, once per container.
+    
+    Deferred from module import so that function discovery and boots
+    that never reach a handler don't pay for SDK setup.
+    """
+    global _sentry_initialized
+    if not _sentry_initialized:
+        init_sentry()
+        _sentry_initialized = True
+
 
 def _clean_environment_secrets() -> None:
     """
@@ -40,27 +71,29 @@ def _clean_environment_secrets() -> None:
     which break API authentication. This function cleans all secrets
     at the entry point before any module uses them.
     
-    Called once per Cloud Function invocation before any business logic.
+    Secrets are injected once at container start, so this runs on the
+    first invocation only; later calls return immediately.
     """
-    secrets_to_clean = [
-        'MAILGUN_API_KEY',
-        'OPENAI_API_KEY',
-        'LANGFUSE_PUBLIC_KEY',
-        'LANGFUSE_SECRET_KEY',
-        'AMPLITUDE_API_KEY',
-    ]
+    global _secrets_cleaned
+    if _secrets_cleaned:
+        return
     
-    for secret_name in secrets_to_clean:
-        original_value = os.getenv(secret_name)
-        if original_value:
-            cleaned_value = original_value.strip()
-            if original_value != cleaned_value:
-                os.environ[secret_name] = cleaned_value
-                info(f"{secret_name} contained whitespace characters (cleaned)", {
-                    "secret_name": secret_name,
-                    "had_leading_space": original_value != original_value.lstrip(),
-                    "had_trailing_space": original_value != original_value.rstrip(),
-                })
+    env = os.environ
+    for secret_name in SECRETS_TO_CLEAN:
+        original_value = env.get(secret_name)
+        if not original_value:
+            continue
+        had_leading_space = original_value[0].isspace()
+        had_trailing_space = original_value[-1].isspace()
+        if had_leading_space or had_trailing_space:
+            env[secret_name] = original_value.strip()
+            info(f"{secret_name} contained whitespace characters (cleaned)", {
+                "secret_name": secret_name,
+                "had_leading_space": had_leading_space,
+                "had_trailing_space": had_trailing_space,
+            })
+    
+    _secrets_cleaned = True
 
 
 def _configure_langfuse() -> None:
@@ -72,7 +105,15 @@ def _configure_langfuse() -> None:
     using LANGFUSE_* environment variables when get_client() is called.
     
     Note: @observe decorator uses native Langfuse API automatically.
+    
+    Runs on the first invocation only; the environment doesn't change
+    for the lifetime of the container.
     """
+    global _langfuse_configured
+    if _langfuse_configured:
+        return
+    _langfuse_configured = True
+    
     public_key = os.getenv("LANGFUSE_PUBLIC_KEY")
     secret_key = os.getenv("LANGFUSE_SECRET_KEY")
     
@@ -97,30 +138,61 @@ def _initialize_cloud_function() -> None:
     Initialize Cloud Function environment.
     
     Called at the start of each Cloud Function invocation to:
-    1. Clean Firebase secrets from trailing whitespace/newlines
-    2. Configure Langfuse SDK environment variables
+    1. Initialize Sentry (first invocation in the container only)
+    2. Clean Firebase secrets from trailing whitespace/newlines
+    3. Configure Langfuse SDK environment variables
     
     This ensures all modules have clean environment variables.
     """
+    _init_sentry_once()
     _clean_environment_secrets()
     _configure_langfuse()
 
 
+# Shared Firestore client (created once per container, see get_firestore_client)
+_firestore_client: Any = None
+_firestore_client_lock = threading.Lock()
+
+
 def get_firestore_client() -> Any:
     """
-    Get Firestore client instance, initializing Firebase Admin if needed.
+    Get the shared Firestore client, initializing Firebase Admin on first use.
+    
+    In the deployed runtime the client is already created at module import
+    (container boot, see below). Elsewhere - local runs, tests, and function
+    discovery by the Firebase CLI during deploy - creation stays lazy to avoid
+    credential issues during module import.
     
-    Lazy initialization to avoid credential issues during module import.
+    Thread-safe: concurrent first calls create a single client (and Firebase
+    app), which all handlers then share along with its gRPC channel.
     """
-    if not firebase_admin._apps:  # type: ignore
-        firebase_admin.initialize_app()  # type: ignore
-    return firestore.client()  # type: ignore
+    global _firestore_client
+    if _firestore_client is not None:
+        return _firestore_client
+    with _firestore_client_lock:
+        if _firestore_client is None:
+            if not firebase_admin._apps:  # type: ignore
+                firebase_admin.initialize_app()  # type: ignore
+            _firestore_client = firestore.client()  # type: ignore
+    return _firestore_client
+
+
+# Create the Firestore client during container boot in the deployed runtime
+# (K_SERVICE is set by Cloud Run, which hosts 2nd gen functions), so the first
+# invocation doesn't pay Firebase Admin/credential setup inline.
+# On failure, get_firestore_client() retries on first use.
+if os.getenv("K_SERVICE"):
+    try:
+        get_firestore_client()
+    except Exception as init_err:
+        _init_sentry_once()
+        warn("Failed to initialize Firestore client at startup", {"error": str(init_err)})
 
 
 @scheduler_fn.on_schedule(
     schedule="every 2 hours",
     region="us-central1",
-    timeout_sec=FUNCTION_TIMEOUTS['notificationOrchestrator'],  # type: ignore
+    timeout_sec=_ORCHESTRATOR_TIMEOUT,
     memory=512,  # 512 MB - increased from default 256 MB for parallel processing
     secrets=[mailgun_api_key, openai_api_key, langfuse_public_key, langfuse_secret_key, amplitude_api_key]
 )
@@ -136,32 +208,69 @@ def notificationOrchestrator(event: scheduler_fn.ScheduledEvent) -> None:
     - Memory: 512 MB for parallel AI generation and Firestore batch operations
     - Expected duration: 15-25 minutes for typical user base (see orchestrator logs)
     """
+    timeout: Any = None
     try:
         # Initialize environment (clean secrets, configure Langfuse)
         _initialize_cloud_function()
         
         # Create timeout monitor (starts background timer automatically)
-        timeout = create_timeout_monitor(FUNCTION_TIMEOUTS['notificationOrchestrator'])  # type: ignore
+        timeout = create_timeout_monitor(_ORCHESTRATOR_TIMEOUT)  # type: ignore
         timeout.check('Starting notification orchestration')
         
         db = get_firestore_client()
         process_notification_orchestration(db)
         
-        # Success - cancel timeout monitor
-        timeout.cancel()
-        
     except Exception as e:
-        # Error occurred - cancel timeout monitor
-        if 'timeout' in locals():
-            timeout.cancel()  # type: ignore
         error("Error in notification orchestrator", {"error": str(e)})
         raise
+    finally:
+        # Stop the timeout monitor on success and on error
+        if timeout is not None:
+            timeout.cancel()  # type: ignore
+
+
+def _extract_welcome_params(
+    event: firestore_fn.Event[firestore_fn.DocumentSnapshot | None]  # type: ignore
+) -> tuple[str, str] | None:
+    """
+    Validate a chat message event for the onboarding welcome email.
+    
+    Only uses the event payload (no Firestore reads, no environment setup),
+    so rejected events cost next to nothing.
+    
+    Args:
+        event: Firestore document created event for a chat message
+        
+    Returns:
+        (user_id, thread_id) for an assistant message, None otherwise
+    """
+    # Extract user ID from document path
+    params = event.params
+    if not params:
+        return None
+    
+    user_id: str = params.get("userId", "")
+    thread_id: str = params.get("threadId", "")
+    if not user_id or not thread_id:
+        return None
+    
+    # Get message data
+    message_snapshot = event.data
+    message_data = message_snapshot.to_dict() if message_snapshot else None  # type: ignore
+    if not message_data:
+        return None
+    
+    # Only trigger for assistant messages (not user messages)
+    if message_data.get('role') != 'assistant':
+        return None
+    
+    return user_id, thread_id
 
 
 @firestore_fn.on_document_created(
     document="users/{userId}/chatThreads/{threadId}/messages/{messageId}",
     region="us-central1",
-    timeout_sec=FUNCTION_TIMEOUTS['onChatMessageCreatedSendWelcomeEmail'],  # type: ignore
+    timeout_sec=_WELCOME_EMAIL_TIMEOUT,
     memory=256,  # 256 MB - default is sufficient for single email
     secrets=[mailgun_api_key, openai_api_key, langfuse_public_key, langfuse_secret_key, amplitude_api_key]
 )
@@ -189,76 +298,65 @@ def onChatMessageCreatedSendWelcomeEmail(
     - Timeout: 9 minutes (540s) - maximum for event-driven Cloud Functions 2nd gen (OpenAI timeout is 8.5 minutes)
     - Memory: 256 MB (default) - sufficient for single user processing
     """
+    # Cheap rejections come first: most messages are user messages, and those
+    # invocations shouldn't pay for environment setup or the Firestore client
+    try:
+        welcome_params = _extract_welcome_params(event)
+    except Exception as e:
+        _init_sentry_once()
+        error("Error in onChatMessageCreatedSendWelcomeEmail trigger", {"error": str(e)})
+        return
+    if welcome_params is None:
+        return
+    user_id, thread_id = welcome_params
+    
+    timeout: Any = None
     try:
         # Initialize environment (clean secrets, configure Langfuse)
         _initialize_cloud_function()
         
         # Create timeout monitor (starts background timer automatically)
-        timeout = create_timeout_monitor(FUNCTION_TIMEOUTS['onChatMessageCreatedSendWelcomeEmail'])  # type: ignore
-        
-        # Extract user ID from document path
-        if not event.params:
-            timeout.cancel()
-            return
-        
-        user_id: str = event.params.get("userId", "")
-        thread_id: str = event.params.get("threadId", "")
-        
-        if not user_id or not thread_id:
-            timeout.cancel()
-            return
-        
-        # Get message data
-        message_data = event.data.to_dict() if event.data else None  # type: ignore
-        if not message_data:
-            timeout.cancel()
-            return
-        
-        # Only trigger for assistant messages (not user messages)
-        if message_data.get('role') != 'assistant':
-            timeout.cancel()
-            return
+        timeout = create_timeout_monitor(_WELCOME_EMAIL_TIMEOUT)  # type: ignore
         
         # Get Firestore client
         db = get_firestore_client()
         
-        # Check if this is the first message in the thread
-        thread_ref = db.collection('users').document(user_id).collection('chatThreads').document(thread_id)  # type: ignore
-        thread_doc = thread_ref.get()  # type: ignore
+        # Read the thread and the user in one batched RPC, projected to the only
+        # fields checked below (get_all may return snapshots in any order, so match them by path)
+        user_ref = db.collection('users').document(user_id)  # type: ignore
+        thread_ref = user_ref.collection('chatThreads').document(thread_id)  # type: ignore
+        snapshots = {
+            snapshot.reference.path: snapshot  # type: ignore
+            for snapshot in db.get_all(  # type: ignore
+                [thread_ref, user_ref],
+                field_paths=['messageCount', 'lastActivityAt'],
+            )
+        }
+        thread_doc = snapshots[thread_ref.path]  # type: ignore
+        user_doc = snapshots[user_ref.path]  # type: ignore
         
+        # Check if this is the first message in the thread
         if not thread_doc.exists:  # type: ignore
-            timeout.cancel()
             return
         
-        thread_data = thread_doc.to_dict()  # type: ignore
-        if not thread_data:
-            timeout.cancel()
-            return
+        # Projected data of an existing doc may be empty (field not set), so no emptiness checks
+        thread_data = thread_doc.to_dict() or {}  # type: ignore
         
         # Only send email for first message (welcome message from web funnel)
         message_count = thread_data.get('messageCount', 0)
         if message_count != 1:
-            timeout.cancel()
             return
         
         # Check if user has logged into app yet
         # If they have lastActivityAt, they signed up via app, not web funnel
-        user_ref = db.collection('users').document(user_id)  # type: ignore
-        user_doc = user_ref.get()  # type: ignore
-        
         if not user_doc.exists:  # type: ignore
-            timeout.cancel()
             return
         
-        user_data = user_doc.to_dict()  # type: ignore
-        if not user_data:
-            timeout.cancel()
-            return
+        user_data = user_doc.to_dict() or {}  # type: ignore
         
         # Skip if user has already logged into app (has lastActivityAt)
         if user_data.get('lastActivityAt'):
             info("Skipping onboarding email - user already logged in", {"user_id": user_id})
-            timeout.cancel()
             return
         
         timeout.check('Sending onboarding welcome email')
@@ -266,13 +364,11 @@ def onChatMessageCreatedSendWelcomeEmail(
         # Send onboarding welcome email
         send_onboarding_welcome_email(db, user_id)
         
-        # Success - cancel timeout monitor
-        timeout.cancel()
-        
     except Exception as e:
-        # Error occurred - cancel timeout monitor
-        if 'timeout' in locals():
-            timeout.cancel()  # type: ignore
         error("Error in onChatMessageCreatedSendWelcomeEmail trigger", {"error": str(e)})
         # Don't raise - we don't want to fail chat creation if email fails
+    finally:
+        # Stop the timeout monitor on every exit path (success, skip, or error)
+        if timeout is not None:
+            timeout.cancel()  # type: ignore
 
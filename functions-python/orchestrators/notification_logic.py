@@ -7,8 +7,11 @@ All functions are stateless and testable - they take user data dict and return d
 Used by notification orchestrator to decide who gets what type of notification.
 """
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any, Literal
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Literal, Mapping
 
 from data.firestore_models import ChatThread, NotificationState
 from utils.logger import warn
@@ -26,50 +29,51 @@ UserCategory = Literal[
 
 # Category-specific notification intervals
 # Each category has its own progressive interval schedule
-# Format: list of timedelta objects representing intervals between notifications
-CATEGORY_INTERVALS: dict[UserCategory, list[timedelta]] = {
-    'EMAIL_ONLY_USER': [
+# Format: tuple of timedelta objects representing intervals between notifications
+# (indexed directly by notification_count, clamped to the last entry)
+CATEGORY_INTERVALS: dict[UserCategory, tuple[timedelta, ...]] = {
+    'EMAIL_ONLY_USER': (
         timedelta(hours=1),   # 1st notification: 1h after registration
         timedelta(hours=6),   # 2nd: 6h after 1st
         timedelta(hours=24),  # 3rd: 24h after 2nd
         timedelta(hours=48),  # 4th: 48h after 3rd
         timedelta(days=7),    # 5th: 7d after 4th (FINAL - see MAX_NOTIFICATIONS_PER_CATEGORY)
-    ],
-    'NEW_USER_PUSH': [
+    ),
+    'NEW_USER_PUSH': (
         timedelta(hours=1),   # Faster cadence for engaged new users
         timedelta(hours=3),
         timedelta(hours=6),
         timedelta(hours=24),
         timedelta(days=3),
-    ],
-    'NEW_USER_EMAIL': [
+    ),
+    'NEW_USER_EMAIL': (
         timedelta(hours=1),
         timedelta(hours=6),
         timedelta(hours=24),
         timedelta(hours=48),
         timedelta(days=7),
-    ],
-    'ACTIVE_USER_PUSH': [
+    ),
+    'ACTIVE_USER_PUSH': (
         timedelta(hours=1),
         timedelta(hours=3),
         timedelta(hours=6),
         timedelta(hours=24),
         timedelta(days=3),
-    ],
-    'ACTIVE_USER_EMAIL': [
+    ),
+    'ACTIVE_USER_EMAIL': (
         timedelta(hours=1),
         timedelta(hours=6),
         timedelta(hours=24),
         timedelta(hours=48),
         timedelta(days=7),
-    ],
-    'INACTIVE_USER_EMAIL': [
+    ),
+    'INACTIVE_USER_EMAIL': (
         timedelta(hours=1),
         timedelta(hours=24),  # Slower cadence for inactive users
         timedelta(hours=48),
         timedelta(days=7),
         timedelta(days=14),
-    ],
+    ),
 }
 
 # Maximum number of notifications per category
@@ -85,7 +89,121 @@ MAX_NOTIFICATIONS_PER_CATEGORY: dict[UserCategory, int | None] = {
 }
 
 
-def should_send_notification(user_data: dict[str, Any], category: UserCategory) -> bool:
+# Shared read-only fallback for users without notification_state (no per-user {} allocation)
+_EMPTY_STATE: Mapping[str, Any] = MappingProxyType({})
+
+# Chat thread documents requested per get_all call when prefetching unread counts
+UNREAD_COUNT_BATCH_SIZE = 500
+
+
+def _read_notification_state(state: Mapping[str, Any]) -> tuple[int, str | None, int | None]:
+    """
+    Read (notification_count, last_notification_at, last_notification_epoch) from state.
+    
+    Well-typed state (what update_notification_state_after_send writes) is read
+    directly, without building a NotificationState model per user. Anything else
+    goes through NotificationState validation, with the same coercions, and falls
+    back to defaults when the data is invalid.
+    """
+    try:
+        notification_count = state.get('notification_count', 0)
+        last_notification_at = state.get('last_notification_at')
+        last_notification_epoch = state.get('last_notification_epoch')
+    except AttributeError:
+        notification_count = None  # Not a mapping - let validation reject it below
+    else:
+        if (
+            type(notification_count) is int
+            and (last_notification_at is None or type(last_notification_at) is str)
+            and (last_notification_epoch is None or type(last_notification_epoch) is int)
+        ):
+            return notification_count, last_notification_at, last_notification_epoch
+    
+    try:
+        model = NotificationState(**state)
+    except Exception:
+        # Fallback to defaults if data is invalid
+        model = NotificationState()
+    return model.notification_count, model.last_notification_at, model.last_notification_epoch
+
+
+@lru_cache(maxsize=1024)
+def _parse_iso_utc(timestamp: str) -> datetime:
+    """
+    Parse an ISO 8601 UTC timestamp into an aware datetime.
+    
+    Fast path for the canonical `toISOString()` shapes written by the app
+    (`YYYY-MM-DDTHH:MM:SSZ` and `YYYY-MM-DDTHH:MM:SS.sssZ`): fields are sliced
+    directly instead of going through the general-purpose parser.
+    Any other shape falls back to `datetime.fromisoformat` (which accepts a
+    trailing `Z` on Python 3.11+); values without an offset are taken as UTC.
+    
+    Memoized: categorization and timing checks read the same user's createdAt /
+    lastActivityAt several times in a row, so repeat parses are cache hits.
+    
+    Args:
+        timestamp: ISO 8601 timestamp string
+        
+    Returns:
+        Timezone-aware datetime
+        
+    Raises:
+        ValueError: If timestamp is not a valid ISO 8601 string
+    """
+    length = len(timestamp)
+    if (
+        (length == 20 or (length == 24 and timestamp[19] == '.'))
+        and timestamp[-1] == 'Z'
+        and timestamp[4] == '-' and timestamp[7] == '-' and timestamp[10] == 'T'
+        and timestamp[13] == ':' and timestamp[16] == ':'
+    ):
+        try:
+            return datetime(
+                int(timestamp[0:4]),
+                int(timestamp[5:7]),
+                int(timestamp[8:10]),
+                int(timestamp[11:13]),
+                int(timestamp[14:16]),
+                int(timestamp[17:19]),
+                int(timestamp[20:23]) * 1000 if length == 24 else 0,
+                timezone.utc,
+            )
+        except ValueError:
+            pass  # Malformed digits - let fromisoformat produce the error
+    
+    parsed = datetime.fromisoformat(timestamp)
+    return parsed if parsed.tzinfo is not None else parsed.replace(tzinfo=timezone.utc)
+
+
+@lru_cache(maxsize=32)
+def _category_cutoffs(category: UserCategory, now: datetime) -> tuple[datetime, ...]:
+    """
+    Latest allowed previous-event time for each interval of a category.
+    
+    `now - event >= interval` is equivalent to `event <= now - interval`, so with a
+    shared `now` per run the subtraction is done once per category instead of per user.
+    """
+    return tuple(now - interval for interval in CATEGORY_INTERVALS[category])
+
+
+@lru_cache(maxsize=32)
+def _category_cutoff_epochs(category: UserCategory, now: datetime) -> tuple[int, ...]:
+    """_category_cutoffs as whole epoch seconds, for comparing last_notification_epoch."""
+    return tuple(int(cutoff.timestamp()) for cutoff in _category_cutoffs(category, now))
+
+
+@lru_cache(maxsize=32)
+def _days_before(now: datetime, days: int) -> datetime:
+    """`now - days` for the activity/registration windows, computed once per (now, days)."""
+    return now - timedelta(days=days)
+
+
+def should_send_notification(
+    user_data: dict[str, Any],
+    category: UserCategory,
+    *,
+    now: datetime | None = None
+) -> bool:
     """
     Check if enough time has passed to send next notification.
     
@@ -98,22 +216,19 @@ def should_send_notification(user_data: dict[str, Any], category: UserCategory)
     Args:
         user_data: User document data from Firestore
         category: User category (determines interval schedule)
+        now: Reference time (default: current UTC time). Pass the same value for
+             every user in a run to avoid a clock read per call.
         
     Returns:
         True if notification should be sent, False otherwise
     """
-    now = datetime.now(timezone.utc)
-    
-    # Get notification state with type validation
-    notification_state_dict = user_data.get('notification_state', {})
-    try:
-        notification_state = NotificationState(**notification_state_dict)
-    except Exception:
-        # Fallback to defaults if data is invalid
-        notification_state = NotificationState()
+    if now is None:
+        now = datetime.now(timezone.utc)
     
-    notification_count = notification_state.notification_count
-    last_notification_at = notification_state.last_notification_at
+    # Get notification state (validated only when it isn't already well-typed)
+    notification_count, last_notification_at, last_notification_epoch = _read_notification_state(
+        user_data.get('notification_state') or _EMPTY_STATE
+    )
     
     # Check if category has reached its notification limit
     max_notifications = MAX_NOTIFICATIONS_PER_CATEGORY.get(category)
@@ -121,8 +236,8 @@ def should_send_notification(user_data: dict[str, Any], category: UserCategory)
         # User has reached the limit for this category - no more notifications
         return False
     
-    # Get category-specific intervals
-    intervals = CATEGORY_INTERVALS[category]
+    # Get category-specific cutoffs (now - interval for each step in the schedule)
+    cutoffs = _category_cutoffs(category, now)
     
     # First notification - check time since registration
     if notification_count == 0:
@@ -131,11 +246,10 @@ def should_send_notification(user_data: dict[str, Any], category: UserCategory)
             warn("User has no createdAt, skipping", {"user_id": user_data.get('id')})
             return False
         
-        created_at = datetime.fromisoformat(created_at_str.replace('Z', '+00:00'))
-        time_since_registration = now - created_at
+        created_at = _parse_iso_utc(created_at_str)
         
         # Use first interval from category schedule
-        return time_since_registration >= intervals[0]
+        return created_at <= cutoffs[0]
     
     # Subsequent notifications - check time since last notification
     if not last_notification_at:
@@ -145,24 +259,29 @@ def should_send_notification(user_data: dict[str, Any], category: UserCategory)
         })
         return False
     
-    last_sent = datetime.fromisoformat(last_notification_at.replace('Z', '+00:00'))
-    time_since_last = now - last_sent
-    
     # Get required interval for this notification number
     # Use last interval in schedule for counts beyond schedule length
-    interval_index: int = min(notification_count, len(intervals) - 1)
-    required_interval: timedelta = intervals[interval_index]
+    cutoff_index = notification_count if notification_count < len(cutoffs) else -1
+    
+    # Denormalized epoch seconds (written since last_notification_epoch was added):
+    # integer compare, no string parsing. Strict `<` against the floored cutoff means
+    # the sub-second part lost by flooring can only delay a send, never advance it.
+    if last_notification_epoch is not None:
+        return last_notification_epoch < _category_cutoff_epochs(category, now)[cutoff_index]
+    
+    last_sent = _parse_iso_utc(last_notification_at)
     
-    return time_since_last >= required_interval
+    return last_sent <= cutoffs[cutoff_index]
 
 
-def was_active_recently(user_data: dict[str, Any], days: int) -> bool:
+def was_active_recently(user_data: dict[str, Any], days: int, *, now: datetime | None = None) -> bool:
     """
     Check if user was active in app within last N days.
     
     Args:
         user_data: User document data
         days: Number of days to check
+        now: Reference time (default: current UTC time)
         
     Returns:
         True if user was active within last N days
@@ -172,21 +291,23 @@ def was_active_recently(user_data: dict[str, Any], days: int) -> bool:
         return False
     
     try:
-        last_activity = datetime.fromisoformat(last_activity_str.replace('Z', '+00:00'))
-        now = datetime.now(timezone.utc)
-        return (now - last_activity) <= timedelta(days=days)
+        last_activity = _parse_iso_utc(last_activity_str)
+        if now is None:
+            now = datetime.now(timezone.utc)
+        return last_activity >= _days_before(now, days)
     except (ValueError, AttributeError):
         warn("Invalid lastActivityAt format", {"lastActivityAt": last_activity_str})
         return False
 
 
-def is_new_user(user_data: dict[str, Any], days: int = 14) -> bool:
+def is_new_user(user_data: dict[str, Any], days: int = 14, *, now: datetime | None = None) -> bool:
     """
     Check if user registered within last N days.
     
     Args:
         user_data: User document data
         days: Number of days to consider "new" (default: 14)
+        now: Reference time (default: current UTC time)
         
     Returns:
         True if user registered within last N days
@@ -196,21 +317,23 @@ def is_new_user(user_data: dict[str, Any], days: int = 14) -> bool:
         return False
     
     try:
-        created_at = datetime.fromisoformat(created_at_str.replace('Z', '+00:00'))
-        now = datetime.now(timezone.utc)
-        return (now - created_at) <= timedelta(days=days)
+        created_at = _parse_iso_utc(created_at_str)
+        if now is None:
+            now = datetime.now(timezone.utc)
+        return created_at >= _days_before(now, days)
     except (ValueError, AttributeError):
         warn("Invalid createdAt format", {"createdAt": created_at_str})
         return False
 
 
-def is_inactive(user_data: dict[str, Any], days: int) -> bool:
+def is_inactive(user_data: dict[str, Any], days: int, *, now: datetime | None = None) -> bool:
     """
     Check if user has been inactive for more than N days.
     
     Args:
         user_data: User document data
         days: Number of days to consider "inactive"
+        now: Reference time (default: current UTC time)
         
     Returns:
         True if user hasn't been active for more than N days
@@ -221,9 +344,10 @@ def is_inactive(user_data: dict[str, Any], days: int) -> bool:
         return False
     
     try:
-        last_activity = datetime.fromisoformat(last_activity_str.replace('Z', '+00:00'))
-        now = datetime.now(timezone.utc)
-        return (now - last_activity) > timedelta(days=days)
+        last_activity = _parse_iso_utc(last_activity_str)
+        if now is None:
+            now = datetime.now(timezone.utc)
+        return last_activity < _days_before(now, days)
     except (ValueError, AttributeError):
         warn("Invalid lastActivityAt format", {"lastActivityAt": last_activity_str})
         return False
@@ -280,10 +404,80 @@ def get_unread_count(db: Any, user_id: str) -> int:
         return 0
 
 
+def _fetch_unread_counts_chunk(db: Any, user_ids: list[str]) -> dict[str, int]:
+    """Read chatThreads/main for a chunk of users in one batched get_all call."""
+    ref_to_user: dict[str, str] = {}
+    thread_refs: list[Any] = []
+    for user_id in user_ids:
+        thread_ref = (
+            db.collection('users')  # type: ignore
+            .document(user_id)  # type: ignore
+            .collection('chatThreads')  # type: ignore
+            .document('main')  # type: ignore
+        )
+        ref_to_user[thread_ref.path] = user_id  # type: ignore
+        thread_refs.append(thread_ref)
+    
+    counts = dict.fromkeys(user_ids, 0)
+    try:
+        for thread_doc in db.get_all(thread_refs, field_paths=['unreadCount']):  # type: ignore
+            if not thread_doc.exists:  # type: ignore
+                continue
+            unread_count = (thread_doc.to_dict() or {}).get('unreadCount', 0)  # type: ignore
+            if isinstance(unread_count, int):
+                counts[ref_to_user[thread_doc.reference.path]] = unread_count  # type: ignore
+    except Exception as err:
+        warn("Failed to batch fetch unread counts", {
+            "user_count": len(user_ids),
+            "error": str(err)
+        })
+    return counts
+
+
+def fetch_unread_counts(
+    db: Any,
+    user_ids: list[str],
+    batch_size: int = UNREAD_COUNT_BATCH_SIZE,
+    max_workers: int = 4
+) -> dict[str, int]:
+    """
+    Fetch unread counts for many users with batched reads.
+    
+    Main chat threads are read with `db.get_all` in chunks of `batch_size`
+    (one round trip per chunk instead of one per user, see get_unread_count);
+    chunks are fetched concurrently. Missing threads and failed chunks count as 0.
+    
+    Reads exactly the candidates' `main` threads. A collection_group('chatThreads')
+    scan would also read non-candidate users and non-main threads for the same
+    number of round trips, so point reads are never worse.
+    
+    Args:
+        db: Firestore client instance
+        user_ids: User document IDs
+        batch_size: Thread documents per get_all call
+        max_workers: Maximum concurrent get_all calls
+        
+    Returns:
+        Dict mapping user_id to unread message count
+    """
+    if not user_ids:
+        return {}
+    
+    chunks = [user_ids[i:i + batch_size] for i in range(0, len(user_ids), batch_size)]
+    counts: dict[str, int] = {}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+        for chunk_counts in executor.map(lambda chunk: _fetch_unread_counts_chunk(db, chunk), chunks):
+            counts.update(chunk_counts)
+    return counts
+
+
 def determine_user_category(
     db: Any,
     user_id: str,
-    user_data: dict[str, Any]
+    user_data: dict[str, Any],
+    *,
+    now: datetime | None = None,
+    unread_count: int | None = None
 ) -> UserCategory:
     """
     Determine user category based on state, activity, and available channels.
@@ -303,6 +497,9 @@ def determine_user_category(
         db: Firestore client instance
         user_id: User document ID
         user_data: User document data from Firestore
+        now: Reference time for activity/registration checks (default: current UTC time)
+        unread_count: Pre-fetched unread count (see fetch_unread_counts); fetched if None
+                      and the user has email and is inactive (the only case it matters)
         
     Returns:
         UserCategory (always returns a category, including NO_CHANNEL_AVAILABLE for users with no channels)
@@ -320,29 +517,34 @@ def determine_user_category(
         >>> determine_user_category(db, 'user3', {'email_unsubscribed': True, 'notificationPermissionStatus': 'denied'})
         'NO_CHANNEL_AVAILABLE'
     """
-    # Priority 1: Check channel availability
-    has_push = (
-        user_data.get('notificationPermissionStatus') == 'granted'
-        and bool(user_data.get('fcmToken'))
+    # Read every field used below once up front
+    get = user_data.get
+    permission_status, fcm_token, email_unsubscribed, last_activity = (
+        get('notificationPermissionStatus'),
+        get('fcmToken'),
+        get('email_unsubscribed', False),
+        get('lastActivityAt'),
     )
-    has_email = not user_data.get('email_unsubscribed', False)
+    
+    # Priority 1: Check channel availability
+    has_push = permission_status == 'granted' and bool(fcm_token)
+    has_email = not email_unsubscribed
     
     # No channels available - this is a valid scenario (user unsubscribed + no push)
     if not has_push and not has_email:
         return 'NO_CHANNEL_AVAILABLE'
     
     # Priority 2: Check INACTIVE (overrides everything if conditions met)
-    # INACTIVE_USER can ONLY be EMAIL per business requirements
-    unread_count = get_unread_count(db, user_id)
-    if unread_count > 0 and is_inactive(user_data, days=10):
-        if has_email:
+    # INACTIVE_USER can ONLY be EMAIL per business requirements: users without email
+    # fall through to other categories (will become ACTIVE_USER_PUSH or NEW_USER_PUSH),
+    # so their unread count is never needed
+    if has_email:
+        if unread_count is not None:
+            if unread_count > 0 and is_inactive(user_data, days=10, now=now):
+                return 'INACTIVE_USER_EMAIL'
+        # Not prefetched: only pay for the thread read when the user is inactive
+        elif is_inactive(user_data, days=10, now=now) and get_unread_count(db, user_id) > 0:
             return 'INACTIVE_USER_EMAIL'
-        # else: Has unread messages but no email channel
-        # Can't send INACTIVE notification via PUSH per business requirements
-        # Fall through to other categories (will become ACTIVE_USER_PUSH or NEW_USER_PUSH)
-    
-    # Get activity status for remaining categories
-    last_activity = user_data.get('lastActivityAt')
     
     # Priority 3: Check if never logged in
     if not last_activity:
@@ -354,7 +556,7 @@ def determine_user_category(
             return 'NEW_USER_PUSH'
     
     # Priority 4: Check if NEW user (< 14 days since registration)
-    if is_new_user(user_data, days=14):
+    if is_new_user(user_data, days=14, now=now):
         # Prefer push for new users, fallback to email
         if has_push:
             return 'NEW_USER_PUSH'
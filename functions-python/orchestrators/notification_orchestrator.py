@@ -98,23 +98,128 @@ Implementation note: Sync Mailgun unsubscribe list at function start, update Fir
 """
 
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from typing import Any
 
 import sentry_sdk  # type: ignore
 
-from data.batch_models import UserChatTask, UserEmailTask
+from data.batch_models import (
+    BatchGenerationResult,
+    ChatBatchGenerationResult,
+    UserChatTask,
+    UserEmailTask,
+)
 from data.chat_batch_generator import generate_chat_messages_in_parallel # type: ignore
 from data.email_batch_generator import generate_emails_in_parallel # type: ignore
 from data.email_operations import create_email_for_sending  # type: ignore
 from data.notification_content import generate_onboarding_welcome_email  # type: ignore
 from data.notification_data import sync_mailgun_unsubscribes
 from orchestrators.notification_logic import (
+    UNREAD_COUNT_BATCH_SIZE,
+    UserCategory,
     determine_user_category,
+    fetch_unread_counts,
+    is_inactive,
     should_send_notification,
 )
 from utils.logger import error, info, warn
 
+# User document fields read by categorization and task creation (STEP 1-2)
+# Used as a Firestore projection so the rest of the user profile is never transferred
+USER_NOTIFICATION_FIELDS: list[str] = [
+    'email',
+    'email_unsubscribed',
+    'fcmToken',
+    'notificationPermissionStatus',
+    'lastActivityAt',
+    'createdAt',
+    'notification_state',
+]
+
+# Page size for the STEP 1 user scan. Each page is a separate short query
+# instead of one long-lived stream over the whole collection.
+USER_QUERY_PAGE_SIZE = 500
+
+# Document ID split points for the STEP 1 user scan. User IDs are random base62
+# Firebase Auth UIDs (byte order 0-9 < A-Z < a-z), so these cut the key space into
+# four roughly equal ranges that are scanned concurrently. The first and last
+# ranges are open-ended, so IDs of any shape are still covered exactly once.
+USER_SCAN_SHARD_BOUNDARIES: tuple[str, ...] = ('F', 'V', 'k')
+
+# Concurrent get_all calls when prefetching unread counts for categorization
+UNREAD_COUNT_FETCH_WORKERS = 4
+
+# Categories delivered by email vs push (checked once per eligible user in STEP 2)
+EMAIL_CATEGORIES: frozenset[UserCategory] = frozenset({
+    'EMAIL_ONLY_USER', 'NEW_USER_EMAIL', 'ACTIVE_USER_EMAIL', 'INACTIVE_USER_EMAIL',
+})
+PUSH_CATEGORIES: frozenset[UserCategory] = frozenset({'NEW_USER_PUSH', 'ACTIVE_USER_PUSH'})
+
+
+def _scan_user_range(
+    users_ref: Any,
+    start_id: str | None,
+    end_id: str | None,
+) -> tuple[list[tuple[str, dict[str, Any]]], int]:
+    """
+    Page through users whose document ID is in [start_id, end_id).
+    
+    Args:
+        users_ref: users collection reference
+        start_id: Inclusive lower ID bound (None = start of collection)
+        end_id: Exclusive upper ID bound (None = end of collection)
+        
+    Returns:
+        (list of (user_id, user_data) in document ID order, number of pages read)
+    """
+    # Only fetch fields used for categorization (see USER_NOTIFICATION_FIELDS),
+    # paginated by document ID so no single query has to scan the whole collection.
+    # No server-side eligibility filter: new user docs have neither notification_state
+    # nor email_unsubscribed, and Firestore range/equality filters never match a
+    # missing field - filtering on them would silently drop never-notified users
+    # (and push-only users, for an email_unsubscribed filter).
+    base_query = (
+        users_ref.select(USER_NOTIFICATION_FIELDS)  # type: ignore
+        .order_by('__name__')  # type: ignore
+        .limit(USER_QUERY_PAGE_SIZE)  # type: ignore
+    )
+    if end_id is not None:
+        base_query = base_query.end_before({'__name__': end_id})  # type: ignore
+    first_query = (
+        base_query.start_at({'__name__': start_id})  # type: ignore
+        if start_id is not None else base_query
+    )
+    
+    users: list[tuple[str, dict[str, Any]]] = []
+    last_doc: Any = None
+    page_count = 0
+    
+    while True:
+        query = base_query.start_after(last_doc) if last_doc is not None else first_query  # type: ignore
+        page_docs = list(query.stream())  # type: ignore
+        if not page_docs:
+            break
+        page_count += 1
+        last_doc = page_docs[-1]
+        
+        for user_doc in page_docs:  # type: ignore
+            user_id: str = user_doc.id  # type: ignore
+            user_data = user_doc.to_dict()  # type: ignore
+            
+            if user_data is None:
+                warn("User has no data, skipping", {"user_id": user_id})
+                continue
+            
+            # Add user_id to data for convenience in logic functions
+            user_data['id'] = user_id
+            users.append((user_id, user_data))
+        
+        if len(page_docs) < USER_QUERY_PAGE_SIZE:
+            break
+    
+    return users, page_count
+
 
 def process_notification_orchestration(db: Any) -> dict[str, Any]:
     """
@@ -186,22 +291,20 @@ def process_notification_orchestration(db: Any) -> dict[str, Any]:
     info("STEP 1: Querying users from Firestore", {})
     try:
         users_ref = db.collection('users')  # type: ignore
-        users_snapshot = users_ref.stream()  # type: ignore
-        all_users: list[tuple[str, dict[str, Any]]] = []
+        # Scan document ID ranges concurrently (see USER_SCAN_SHARD_BOUNDARIES);
+        # results are concatenated in range order, so users stay sorted by ID
+        bounds: list[str | None] = [None, *USER_SCAN_SHARD_BOUNDARIES, None]
+        ranges = list(zip(bounds[:-1], bounds[1:]))
+        with ThreadPoolExecutor(max_workers=len(ranges), thread_name_prefix='user-scan') as executor:
+            shard_results = list(executor.map(lambda r: _scan_user_range(users_ref, *r), ranges))
         
-        for user_doc in users_snapshot:  # type: ignore
-            user_id: str = user_doc.id  # type: ignore
-            user_data = user_doc.to_dict()  # type: ignore
-            
-            if user_data is None:
-                warn("User has no data, skipping", {"user_id": user_id})
-                continue
-            
-            # Add user_id to data for convenience in logic functions
-            user_data['id'] = user_id
-            all_users.append((user_id, user_data))
+        all_users: list[tuple[str, dict[str, Any]]] = []
+        page_count = 0
+        for shard_users, shard_pages in shard_results:
+            all_users.extend(shard_users)
+            page_count += shard_pages
         
-        info("User query complete", {"total_users": len(all_users)})
+        info("User query complete", {"total_users": len(all_users), "pages": page_count})
     except Exception as err:
         error("Failed to query users", {"error": str(err)})
         raise
@@ -216,10 +319,38 @@ def process_notification_orchestration(db: Any) -> dict[str, Any]:
     skipped_timing = 0
     skipped_no_channel = 0
     
+    # Single reference time for the whole pass (one clock read instead of several per user)
+    now = datetime.now(timezone.utc)
+    
+    # Fetch unread counts up front in batched reads, instead of one sequential
+    # chat thread read per user inside the loop below. The count only matters for
+    # INACTIVE_USER_EMAIL, so only email users inactive for 10+ days are read
+    # (everyone else defaults to 0, which determine_user_category never needs).
+    unread_candidates = [
+        user_id for user_id, user_data in all_users
+        if not user_data.get('email_unsubscribed', False)
+        and is_inactive(user_data, days=10, now=now)
+    ]
+    # Size get_all chunks from the candidate count so every worker gets a share
+    # (bounded to 100-500 documents per call)
+    unread_batch_size = min(
+        UNREAD_COUNT_BATCH_SIZE,
+        max(100, -(-len(unread_candidates) // UNREAD_COUNT_FETCH_WORKERS)),
+    )
+    unread_counts = fetch_unread_counts(
+        db,
+        unread_candidates,
+        batch_size=unread_batch_size,
+        max_workers=UNREAD_COUNT_FETCH_WORKERS,
+    )
+    
     for user_id, user_data in all_users:
+        get = user_data.get
+        
         # Determine user category (combines channel + scenario logic)
-        from orchestrators.notification_logic import UserCategory
-        category: UserCategory = determine_user_category(db, user_id, user_data)
+        category: UserCategory = determine_user_category(
+            db, user_id, user_data, now=now, unread_count=unread_counts.get(user_id, 0)
+        )
         
         # Skip users with no available channels (valid scenario - user opted out)
         if category == 'NO_CHANNEL_AVAILABLE':
@@ -227,13 +358,13 @@ def process_notification_orchestration(db: Any) -> dict[str, Any]:
             continue
         
         # Check if enough time has passed for next notification
-        if not should_send_notification(user_data, category):
+        if not should_send_notification(user_data, category, now=now):
             skipped_timing += 1
             continue
         
         # Create appropriate task based on category
-        if category in ['EMAIL_ONLY_USER', 'NEW_USER_EMAIL', 'ACTIVE_USER_EMAIL', 'INACTIVE_USER_EMAIL']:
-            user_email = user_data.get('email', '').strip()
+        if category in EMAIL_CATEGORIES:
+            user_email = (get('email') or '').strip()
             if not user_email:
                 error("User has EMAIL category but no valid email address", {
                     "user_id": user_id,
@@ -247,8 +378,8 @@ def process_notification_orchestration(db: Any) -> dict[str, Any]:
                 user_email=user_email,
                 scenario=category,
             ))
-        elif category in ['NEW_USER_PUSH', 'ACTIVE_USER_PUSH']:
-            fcm_token = user_data.get('fcmToken', '').strip()
+        elif category in PUSH_CATEGORIES:
+            fcm_token = (get('fcmToken') or '').strip()
             if not fcm_token:
                 error("User has PUSH category but no valid FCM token", {
                     "user_id": user_id,
@@ -274,50 +405,61 @@ def process_notification_orchestration(db: Any) -> dict[str, Any]:
     
     check_execution_time("STEP 2: Categorization")
     
-    # === STEP 3a: Batch generate emails ===
-    email_result = None
-    if email_tasks:
+    # === STEP 3: Batch generate emails (3a) and push messages (3b) ===
+    # The two channels are independent and each has its own worker pool, so they
+    # run at the same time (wall time is the slower step instead of the sum of both)
+    def generate_emails() -> BatchGenerationResult | None:
+        """STEP 3a: Generate and queue emails (None if nothing to do or on failure)."""
+        if not email_tasks:
+            info("STEP 3a: No emails to generate", {})
+            return None
         info("STEP 3a: Generating emails in parallel", {"count": len(email_tasks)})
         try:
-            email_result = generate_emails_in_parallel(
+            result = generate_emails_in_parallel(
                 db=db,  # type: ignore
                 user_tasks=email_tasks,
                 batch_size=20,
                 max_workers=20,
             )
             info("Email generation complete", {
-                "successful": email_result.success_count,
-                "failed": email_result.failure_count,
+                "successful": result.success_count,
+                "failed": result.failure_count,
             })
+            return result
         except Exception as err:
+            # Push notifications continue even if emails failed
             error("Email generation failed", {"error": str(err)})
-            # Continue with push notifications even if emails failed
-    else:
-        info("STEP 3a: No emails to generate", {})
+            return None
     
-    check_execution_time("STEP 3a: Email generation")
-    
-    # === STEP 3b: Batch generate push notifications ===
-    push_result = None
-    if push_tasks:
+    def generate_pushes() -> ChatBatchGenerationResult | None:
+        """STEP 3b: Generate and write push messages (None if nothing to do or on failure)."""
+        if not push_tasks:
+            info("STEP 3b: No push messages to generate", {})
+            return None
         info("STEP 3b: Generating push messages in parallel", {"count": len(push_tasks)})
         try:
-            push_result = generate_chat_messages_in_parallel(
+            result = generate_chat_messages_in_parallel(
                 db=db,  # type: ignore
                 user_tasks=push_tasks,
                 batch_size=10,
                 max_workers=10,
             )
             info("Push generation complete", {
-                "successful": push_result.success_count,
-                "failed": push_result.failure_count,
+                "successful": result.success_count,
+                "failed": result.failure_count,
             })
+            return result
         except Exception as err:
             error("Push generation failed", {"error": str(err)})
-    else:
-        info("STEP 3b: No push messages to generate", {})
+            return None
+    
+    with ThreadPoolExecutor(max_workers=2, thread_name_prefix='notification-generation') as executor:
+        email_future = executor.submit(generate_emails)
+        push_future = executor.submit(generate_pushes)
+        email_result = email_future.result()
+        push_result = push_future.result()
     
-    check_execution_time("STEP 3b: Push generation")
+    check_execution_time("STEP 3: Email and push generation")
     
     # NOTE: Notification counters are now updated inside batch generators
     # immediately after each chunk write to prevent spam if subsequent operations fail.
@@ -396,6 +538,7 @@ def send_onboarding_welcome_email(db: Any, user_id: str) -> None:
             db=db,
             user_id=user_id,
             session_id=session_id,
+            user_data=user_data,
         )
         
         # Create email document in Firestore
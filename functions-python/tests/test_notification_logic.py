@@ -23,7 +23,10 @@ from datetime import datetime, timedelta, timezone
 from unittest.mock import MagicMock
 
 from orchestrators.notification_logic import (  # type: ignore
+    _parse_iso_utc,  # type: ignore
+    _read_notification_state,  # type: ignore
     determine_user_category,  # type: ignore
+    fetch_unread_counts,  # type: ignore
     is_inactive,  # type: ignore
     is_new_user,  # type: ignore
     should_send_notification,  # type: ignore
@@ -51,6 +54,48 @@ def create_mock_db(unread_count: int = 0) -> MagicMock:
     
     return mock_db
 
+def test_parse_iso_utc():
+    """Test ISO timestamp parsing (fast path and fallback)."""
+    expected = datetime(2025, 11, 20, 10, 0, 0, tzinfo=timezone.utc)
+    
+    # Canonical JavaScript toISOString() shapes - fast path
+    assert _parse_iso_utc('2025-11-20T10:00:00Z') == expected
+    assert _parse_iso_utc('2025-11-20T10:00:00.250Z') == expected + timedelta(milliseconds=250)
+    
+    # Python isoformat() shape - fallback path
+    assert _parse_iso_utc('2025-11-20T10:00:00.000001+00:00') == expected + timedelta(microseconds=1)
+    assert _parse_iso_utc('2025-11-20T12:00:00+02:00') == expected
+    
+    # Values without an offset are treated as UTC
+    assert _parse_iso_utc('2025-11-20T10:00:00') == expected
+    
+    # Invalid values still raise ValueError
+    try:
+        _parse_iso_utc('2025-13-20T10:00:00.000Z')
+        assert False, "Expected ValueError"
+    except ValueError:
+        pass
+
+
+def test_read_notification_state():
+    """Test notification_state reads (direct path and validation fallback)."""
+    # Well-typed state is read as-is
+    assert _read_notification_state({}) == (0, None, None)
+    assert _read_notification_state({
+        'notification_count': 2,
+        'last_notification_at': '2025-11-20T10:00:00.000Z',
+        'last_notification_epoch': 1763632800,
+    }) == (2, '2025-11-20T10:00:00.000Z', 1763632800)
+    
+    # Other shapes get NotificationState coercion
+    assert _read_notification_state({'notification_count': '3'}) == (3, None, None)
+    assert _read_notification_state({'notification_count': 2.0, 'last_notification_epoch': '5'}) == (2, None, 5)
+    
+    # Invalid state falls back to defaults
+    assert _read_notification_state({'notification_count': 'many'}) == (0, None, None)
+    assert _read_notification_state('corrupted') == (0, None, None)  # type: ignore
+
+
 def test_should_send_notification_first_notification() -> None:
     """Test first notification timing (1 hour after registration)."""
     now = datetime.now(timezone.utc)
@@ -160,6 +205,26 @@ def test_should_send_notification_progressive_intervals():
     assert should_send_notification(user_2nd_inactive, 'INACTIVE_USER_EMAIL') is True
 
 
+def test_should_send_notification_epoch_state():
+    """Test interval check using denormalized last_notification_epoch."""
+    now = datetime(2025, 11, 20, 12, 0, 0, tzinfo=timezone.utc)
+    
+    def user_with_epoch(hours_ago: float) -> dict:
+        return {
+            'createdAt': '2025-01-01T00:00:00.000Z',
+            'notification_state': {
+                'notification_count': 1,
+                # Deliberately stale string: the epoch takes precedence when present
+                'last_notification_at': '2000-01-01T00:00:00.000Z',
+                'last_notification_epoch': int((now - timedelta(hours=hours_ago)).timestamp()),
+            },
+        }
+    
+    # ACTIVE_USER_PUSH 2nd notification requires 3 hours
+    assert should_send_notification(user_with_epoch(2), 'ACTIVE_USER_PUSH', now=now) is False
+    assert should_send_notification(user_with_epoch(4), 'ACTIVE_USER_PUSH', now=now) is True
+
+
 def test_should_send_notification_max_limit():
     """Test that EMAIL_ONLY_USER and INACTIVE_USER_EMAIL stop after 5 notifications."""
     now = datetime.now(timezone.utc)
@@ -274,6 +339,83 @@ def test_is_inactive():
     assert is_inactive(user_never_logged_in, days=7) is False
 
 
+def test_explicit_reference_time():
+    """Test that an explicit `now` is used instead of the current clock."""
+    created = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    user = {
+        'createdAt': '2024-01-01T00:00:00.000Z',
+        'lastActivityAt': '2024-01-01T00:00:00.000Z',
+        'notification_state': {'notification_count': 0},
+    }
+    
+    assert is_new_user(user, days=14, now=created + timedelta(days=7)) is True
+    assert is_new_user(user, days=14, now=created + timedelta(days=30)) is False
+    assert is_inactive(user, days=7, now=created + timedelta(days=10)) is True
+    assert was_active_recently(user, days=6, now=created + timedelta(days=1)) is True
+    assert should_send_notification(user, 'ACTIVE_USER_PUSH', now=created + timedelta(minutes=30)) is False
+    assert should_send_notification(user, 'ACTIVE_USER_PUSH', now=created + timedelta(hours=2)) is True
+    assert determine_user_category(
+        create_mock_db(), 'user1', {**user, 'email_unsubscribed': False}, now=created + timedelta(days=30)
+    ) == 'ACTIVE_USER_EMAIL'
+
+
+def create_mock_batch_db(unread_counts: dict[str, int]) -> MagicMock:
+    """
+    Create a mock Firestore db client whose get_all returns main chat threads.
+    
+    Args:
+        unread_counts: Unread count per user_id (users not listed have no thread)
+        
+    Returns:
+        Mock db supporting db.collection('users').document(uid)...document('main') and get_all
+    """
+    mock_db = MagicMock()
+    
+    def thread_ref_for(user_id: str) -> MagicMock:
+        thread_ref = MagicMock()
+        thread_ref.path = f'users/{user_id}/chatThreads/main'
+        return thread_ref
+    
+    def user_ref_for(user_id: str) -> MagicMock:
+        user_ref = MagicMock()
+        user_ref.collection.return_value.document.side_effect = lambda _: thread_ref_for(user_id)
+        return user_ref
+    
+    def get_all(refs, field_paths=None):
+        for ref in refs:
+            user_id = ref.path.split('/')[1]
+            snapshot = MagicMock()
+            snapshot.reference = ref
+            snapshot.exists = user_id in unread_counts
+            snapshot.to_dict.return_value = {'unreadCount': unread_counts.get(user_id, 0)}
+            yield snapshot
+    
+    mock_db.collection.return_value.document.side_effect = user_ref_for
+    mock_db.get_all.side_effect = get_all
+    return mock_db
+
+
+def test_fetch_unread_counts():
+    """Test batched unread count prefetch and its use in categorization."""
+    mock_db = create_mock_batch_db({'user1': 3, 'user3': 1})
+    
+    assert fetch_unread_counts(mock_db, ['user1', 'user2', 'user3'], batch_size=2) == {
+        'user1': 3, 'user2': 0, 'user3': 1,
+    }
+    assert mock_db.get_all.call_count == 2
+    assert fetch_unread_counts(mock_db, []) == {}
+    
+    # Pre-fetched count is used instead of querying Firestore
+    now = datetime.now(timezone.utc)
+    inactive_user = {
+        'email_unsubscribed': False,
+        'createdAt': (now - timedelta(days=30)).isoformat(),
+        'lastActivityAt': (now - timedelta(days=15)).isoformat(),
+    }
+    assert determine_user_category(create_mock_db(0), 'user1', inactive_user, unread_count=2) == 'INACTIVE_USER_EMAIL'
+    assert determine_user_category(create_mock_db(3), 'user1', inactive_user, unread_count=0) == 'ACTIVE_USER_EMAIL'
+
+
 def test_determine_user_category_email_only():
     """Test EMAIL_ONLY_USER category."""
     mock_db = create_mock_db(unread_count=0)
@@ -398,6 +540,33 @@ def test_determine_user_category_inactive_email():
     assert determine_user_category(mock_db_with_unread, 'test_user_id', user_inactive_no_email) == 'ACTIVE_USER_PUSH'
 
 
+def test_determine_user_category_skips_unread_read():
+    """Test that the unread count is only read when INACTIVE_USER_EMAIL is reachable."""
+    now = datetime.now(timezone.utc)
+    
+    # Recently active email user - not inactive, so no thread read
+    mock_db = create_mock_db(unread_count=5)
+    user_active_email = {
+        'lastActivityAt': (now - timedelta(days=2)).isoformat(),
+        'createdAt': (now - timedelta(days=30)).isoformat(),
+        'email_unsubscribed': False,
+    }
+    assert determine_user_category(mock_db, 'test_user_id', user_active_email) == 'ACTIVE_USER_EMAIL'
+    mock_db.collection.assert_not_called()
+    
+    # Inactive push-only user - INACTIVE requires email, so no thread read
+    mock_db = create_mock_db(unread_count=5)
+    user_inactive_no_email = {
+        'lastActivityAt': (now - timedelta(days=10)).isoformat(),
+        'createdAt': (now - timedelta(days=60)).isoformat(),
+        'notificationPermissionStatus': 'granted',
+        'fcmToken': 'valid_token',
+        'email_unsubscribed': True,
+    }
+    assert determine_user_category(mock_db, 'test_user_id', user_inactive_no_email) == 'ACTIVE_USER_PUSH'
+    mock_db.collection.assert_not_called()
+
+
 def test_determine_user_category_no_channel():
     """Test no channel available returns NO_CHANNEL_AVAILABLE."""
     mock_db = create_mock_db(unread_count=0)
@@ -415,6 +584,13 @@ def test_determine_user_category_no_channel():
 if __name__ == '__main__':
     print("Running notification logic tests...")
     
+    # Timestamp parsing tests
+    test_parse_iso_utc()
+    print("✓ ISO timestamp parsing")
+    
+    test_read_notification_state()
+    print("✓ Notification state reads")
+    
     # Timing tests
     test_should_send_notification_first_notification()
     print("✓ First notification timing (category-specific)")
@@ -422,6 +598,9 @@ if __name__ == '__main__':
     test_should_send_notification_progressive_intervals()
     print("✓ Progressive intervals (category-specific)")
     
+    test_should_send_notification_epoch_state()
+    print("✓ Epoch notification state")
+    
     # Helper function tests
     test_was_active_recently()
     print("✓ Recent activity detection")
@@ -432,6 +611,12 @@ if __name__ == '__main__':
     test_is_inactive()
     print("✓ Inactive user detection")
     
+    test_explicit_reference_time()
+    print("✓ Explicit reference time")
+    
+    test_fetch_unread_counts()
+    print("✓ Unread count prefetch")
+    
     # Category determination tests
     test_determine_user_category_email_only()
     print("✓ EMAIL_ONLY_USER category")
@@ -451,6 +636,9 @@ if __name__ == '__main__':
     test_determine_user_category_inactive_email()
     print("✓ INACTIVE_USER_EMAIL category")
     
+    test_determine_user_category_skips_unread_read()
+    print("✓ Unread count read only when needed")
+    
     test_determine_user_category_no_channel()
     print("✓ No channel detection")
     
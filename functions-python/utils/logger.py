@@ -14,12 +14,20 @@ import sentry_sdk  # type: ignore
 _logger = logging.getLogger(__name__)
 
 
+def _sentry_enabled() -> bool:
+    """Whether a Sentry client is initialized (no scope work otherwise, e.g. tests/local runs)."""
+    return sentry_sdk.get_client().is_active()
+
+
 def info(message: str, context: dict[str, Any]) -> None:
     """
     Log informational messages.
     Only sends to console, not to Sentry.
+    Skips the call entirely when INFO is disabled for this logger.
     """
-    _logger.info(f"{message} | {context}")
+    if not _logger.isEnabledFor(logging.INFO):
+        return
+    _logger.info("%s | %s", message, context)
 
 
 def error(message: str, context: dict[str, Any]) -> None:
@@ -27,26 +35,36 @@ def error(message: str, context: dict[str, Any]) -> None:
     Log error messages.
     Sends to both console and Sentry with full context.
     """
-    _logger.error(f"{message} | {context}")
+    _logger.error("%s | %s", message, context)
+    
+    if not _sentry_enabled():
+        return
     
-    # Send to Sentry with context using scope
-    with sentry_sdk.push_scope() as scope:  # type: ignore
-        for key, value in context.items():
-            scope.set_extra(key, value)  # type: ignore
+    # Send to Sentry with context attached to a forked scope
+    with sentry_sdk.new_scope() as scope:  # type: ignore
+        scope.set_context("log_context", dict(context))  # type: ignore
         sentry_sdk.capture_exception(Exception(message))  # type: ignore
 
 
-def warn(message: str, context: dict[str, Any]) -> None:
+def warn(message: str, context: dict[str, Any], *, sentry: bool = True) -> None:
     """
     Log warning messages.
     Sends to both console and Sentry with warning level.
+    With sentry=False (high-volume sites, e.g. per-document parse failures) the
+    warning is only recorded as a Sentry breadcrumb, attached to the next event.
     """
-    _logger.warning(f"{message} | {context}")
+    _logger.warning("%s | %s", message, context)
+    
+    if not _sentry_enabled():
+        return
+    
+    if not sentry:
+        sentry_sdk.add_breadcrumb(category="warn", message=message, data=context, level="warning")  # type: ignore
+        return
     
-    # Send to Sentry as warning using scope
-    with sentry_sdk.push_scope() as scope:  # type: ignore
-        for key, value in context.items():
-            scope.set_extra(key, value)  # type: ignore
+    # Send to Sentry as warning with context attached to a forked scope
+    with sentry_sdk.new_scope() as scope:  # type: ignore
+        scope.set_context("log_context", dict(context))  # type: ignore
         sentry_sdk.capture_message(message, level="warning")  # type: ignore
 
 
@@ -54,6 +72,9 @@ def debug(message: str, context: dict[str, Any]) -> None:
     """
     Log debug messages.
     Only sends to console, not to Sentry.
+    Skips the call entirely when DEBUG is disabled for this logger.
     """
-    _logger.debug(f"{message} | {context}")
+    if not _logger.isEnabledFor(logging.DEBUG):
+        return
+    _logger.debug("%s | %s", message, context)
 
@@ -39,6 +39,7 @@ def call_openai_with_structured_output(
     generation_name: str | None = None,
     metadata: dict[str, Any] | None = None,
     max_retries: int = 3,
+    system_prompt: str | None = None,
 ) -> T:
     """
     Call OpenAI API with structured output and retry logic.
@@ -47,6 +48,11 @@ def call_openai_with_structured_output(
     Properly sets user_id and session_id as trace-level attributes.
     Retries up to max_retries times on parsing failures.
     
+    When system_prompt is given it is sent as its own system message ahead of the
+    prompt (sent as the user message). Requests sharing a static system prompt then
+    share a cacheable prefix; generation_name is passed as prompt_cache_key so they
+    are routed to the same OpenAI prompt cache.
+    
     Args:
         prompt: User prompt to send to OpenAI
         response_model: Pydantic model defining expected response structure
@@ -56,6 +62,7 @@ def call_openai_with_structured_output(
         generation_name: Name for this generation in LangFuse
         metadata: Additional metadata for LangFuse
         max_retries: Maximum number of retry attempts
+        system_prompt: Static system prompt (if None, prompt is sent as the system message)
         
     Returns:
         Validated Pydantic model instance
@@ -99,9 +106,15 @@ def call_openai_with_structured_output(
     client = OpenAI(api_key=api_key, timeout=510.0)
     
     # Build messages array
-    messages = [
-        {"role": "system", "content": prompt}
-    ]
+    if system_prompt is not None:
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": prompt},
+        ]
+    else:
+        messages = [
+            {"role": "system", "content": prompt}
+        ]
     
     last_error = None
     last_error_details = {}
@@ -143,6 +156,10 @@ def call_openai_with_structured_output(
             if user_id:
                 api_params["user"] = user_id
             
+            # Route requests with the same static system prompt to the same prompt cache
+            if system_prompt is not None and generation_name:
+                api_params["prompt_cache_key"] = generation_name
+            
             completion = client.beta.chat.completions.parse(**api_params)  # type: ignore
             
             # Calculate request duration
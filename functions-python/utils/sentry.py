@@ -47,7 +47,7 @@ def get_environment() -> str:
 def init_sentry() -> None:
     """
     Initialize Sentry with proper configuration.
-    Should be called once at module load time.
+    Should be called once per process (main.py defers it to the first invocation).
     """
     version = get_version()
     environment = get_environment()